@@ -0,0 +1,178 @@
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from manim import tempconfig, WHITE, DARK_GRAY
+from manim.utils.family import extract_mobject_family_members
+
+from neural_network_explanation_presentation_animations.configuration import set_up_configuration, set_render_mode, \
+    render_mode_settings
+
+default_baseline_path = Path('benchmark_baseline.json')
+compared_metric_names = ('seconds', 'peak_rss_megabytes', 'mobject_count')
+
+
+def peak_rss_megabytes() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak_rss / 1024 ** 2  # Bytes on macOS, kilobytes elsewhere.
+    return peak_rss / 1024
+
+
+def benchmark_isometric_sub_scene(number_of_pixels: int) -> int:
+    from neural_network_explanation_presentation_animations.isometric_neurons_looking_at_pixels_sub_scene import \
+        IsometricNeuronsLookingAtPixelsSubScene
+    sub_scene = IsometricNeuronsLookingAtPixelsSubScene(number_of_pixels=number_of_pixels)
+    # Neuron groups are built lazily, building all of them as the main scene does keeps the count comparable.
+    sub_scene.neuron_groups.create_all_neuron_groups()
+    return len(sub_scene.v_group.get_family())
+
+
+def benchmark_pixel_grid_square(number_of_pixels: int) -> int:
+    from neural_network_explanation_presentation_animations.layers_building_complexity_sub_scene import \
+        PixelGridSquare
+    color_array = np.where(np.indices((number_of_pixels, number_of_pixels)).sum(axis=0) % 2 == 0, WHITE, DARK_GRAY)
+    text_array = np.where(np.indices((number_of_pixels, number_of_pixels))[1] % 3 == 0, 'g', '')
+    pixel_grid_square = PixelGridSquare(number_of_pixels=number_of_pixels, color_array=color_array,
+                                        text_array=text_array)
+    return len(pixel_grid_square.v_group.get_family())
+
+
+def benchmark_layer_sub_scene() -> int:
+    from neural_network_explanation_presentation_animations.layers_building_complexity_sub_scene import \
+        LayerBuildingComplexitySubScene
+    sub_scene = LayerBuildingComplexitySubScene()
+    return len(sub_scene.v_group.get_family())
+
+
+def benchmark_three_d_scene(number_of_pixels: int) -> int:
+    from neural_network_explanation_presentation_animations.three_d_neurons_looking_at_pixels_scene import \
+        ThreeDNeuronsLookingAtPixelsScene
+    # A dry run constructs every mobject and animation without rasterizing or encoding.
+    with tempconfig({'dry_run': True}):
+        scene = ThreeDNeuronsLookingAtPixelsScene(number_of_pixels=number_of_pixels)
+        scene.render()
+    return len(extract_mobject_family_members(scene.mobjects))
+
+
+def benchmark_main_scene_sections(first_section: str, last_section: str) -> int:
+    from neural_network_explanation_presentation_animations.main_scene import MainScene
+    from neural_network_explanation_presentation_animations.sectioned_scene import SectionRangeSelection
+    from neural_network_explanation_presentation_animations.sub_scene_cache import SubSceneCache
+    with tempfile.TemporaryDirectory() as media_directory:
+        with tempconfig({'media_dir': media_directory, 'disable_caching': True}):
+            # A fresh sub-scene cache, so every run measures the same construction work.
+            scene = MainScene(sub_scene_cache=SubSceneCache(Path(media_directory, 'sub_scene_cache')),
+                              section_selection=SectionRangeSelection(first_section, last_section))
+            scene.render()
+    return len(extract_mobject_family_members(scene.mobjects))
+
+
+def run_benchmark_case_in_worker(benchmark_function: Callable[..., int], arguments: Tuple) -> Dict[str, float]:
+    set_up_configuration()
+    start_time = time.perf_counter()
+    mobject_count = benchmark_function(*arguments)
+    return {
+        'seconds': time.perf_counter() - start_time,
+        'peak_rss_megabytes': peak_rss_megabytes(),
+        'mobject_count': mobject_count,
+    }
+
+
+def create_benchmark_cases(pixel_counts: List[int], three_d_pixel_counts: List[int]
+                           ) -> Dict[str, Tuple[Callable[..., int], Tuple]]:
+    benchmark_cases: Dict[str, Tuple[Callable[..., int], Tuple]] = {}
+    for number_of_pixels in pixel_counts:
+        benchmark_cases[f'isometric_sub_scene_{number_of_pixels}'] = (benchmark_isometric_sub_scene,
+                                                                      (number_of_pixels,))
+        benchmark_cases[f'pixel_grid_square_{number_of_pixels}'] = (benchmark_pixel_grid_square, (number_of_pixels,))
+    benchmark_cases['layer_sub_scene'] = (benchmark_layer_sub_scene, ())
+    for number_of_pixels in three_d_pixel_counts:
+        benchmark_cases[f'three_d_scene_{number_of_pixels}'] = (benchmark_three_d_scene, (number_of_pixels,))
+    for first_section, last_section in [('coordinate_swap', 'coordinate_swap'),
+                                        ('remaining_neurons', 'remaining_neurons'),
+                                        ('corner_in_image', 'corner_in_image')]:
+        benchmark_cases[f'render_{first_section}'] = (benchmark_main_scene_sections, (first_section, last_section))
+    return benchmark_cases
+
+
+def run_benchmarks(benchmark_cases: Dict[str, Tuple[Callable[..., int], Tuple]], repeats: int
+                   ) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for case_name, (benchmark_function, arguments) in benchmark_cases.items():
+        case_results = []
+        for _ in range(repeats):
+            # A fresh process per run keeps the peak RSS of each case separate and the timings free of warm caches.
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                case_results.append(executor.submit(run_benchmark_case_in_worker, benchmark_function,
+                                                    arguments).result())
+        results[case_name] = {metric_name: min(case_result[metric_name] for case_result in case_results)
+                              for metric_name in compared_metric_names}
+        print(f"{case_name:<36} {results[case_name]['seconds']:>8.2f}s "
+              f"{results[case_name]['peak_rss_megabytes']:>8.0f} MB {results[case_name]['mobject_count']:>9} mobjects")
+    return results
+
+
+def find_regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                     threshold: float) -> List[str]:
+    regressions = []
+    for case_name, case_result in results.items():
+        baseline_result = baseline.get(case_name)
+        if baseline_result is None:
+            continue
+        for metric_name in compared_metric_names:
+            if case_result[metric_name] > baseline_result[metric_name] * (1 + threshold):
+                regressions.append(f'{case_name} {metric_name}: {case_result[metric_name]:.2f} vs baseline '
+                                   f'{baseline_result[metric_name]:.2f}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark scene construction and rendering across grid sizes. The baseline is machine specific: '
+                    'store it with --update-baseline on the machine that runs the comparison (for CI, the CI runner, '
+                    'from the main branch) and commit it, as comparing without one fails.')
+    parser.add_argument('--pixels', type=int, nargs='+', default=[10, 20, 40, 80],
+                        help='Grid sizes to build the isometric sub-scene and pixel grid square at.')
+    parser.add_argument('--three-d-pixels', type=int, nargs='+', default=[10, 20],
+                        help='Grid sizes (even) to build the 3D scene at.')
+    parser.add_argument('--repeats', type=int, default=1, help='Runs per case, the best run is kept.')
+    parser.add_argument('--baseline', type=Path, default=default_baseline_path,
+                        help='Stored results to compare against.')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Fail when a metric exceeds its baseline by more than this fraction.')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Store these results as the new baseline instead of comparing.')
+    parser.add_argument('--mode', choices=list(render_mode_settings), default=None,
+                        help='Render mode to benchmark in. The baseline must be stored in the same mode.')
+    arguments = parser.parse_args()
+    if arguments.mode is not None:
+        set_render_mode(arguments.mode)  # Inherited by the spawned benchmark processes through the environment.
+    results = run_benchmarks(create_benchmark_cases(arguments.pixels, arguments.three_d_pixels), arguments.repeats)
+    if arguments.update_baseline:
+        arguments.baseline.write_text(json.dumps(results, indent=2))
+        print(f'Stored baseline {arguments.baseline}')
+        return
+    if not arguments.baseline.exists():
+        # Without a baseline there is nothing to pass against, so this fails rather than silently succeeding.
+        print(f'No baseline at {arguments.baseline}, run with --update-baseline on the reference machine and commit '
+              f'it.')
+        sys.exit(1)
+    regressions = find_regressions(results, json.loads(arguments.baseline.read_text()), arguments.threshold)
+    for regression in regressions:
+        print(f'Regression: {regression}')
+    if len(regressions) > 0:
+        sys.exit(1)
+    print('No regressions.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from main import section_index_or_name
+from neural_network_explanation_presentation_animations.configuration import set_up_configuration, set_render_mode, \
+    get_render_mode, render_mode_settings
+from neural_network_explanation_presentation_animations.frame_sampling import sample_scene_frames, \
+    compare_frame_samples
+from neural_network_explanation_presentation_animations.main_scene import MainScene
+from neural_network_explanation_presentation_animations.sectioned_scene import SectionRangeSelection
+
+
+def default_golden_path() -> Path:
+    # One file per render mode, as each mode renders at its own resolution and with its own placeholders.
+    return Path(f'frame_regression_golden_{get_render_mode()}.npz')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Render the first and last frame of each section without encoding video and compare them against '
+                    'golden samples. Store the golden samples with --update-golden (per --mode) from a known good '
+                    'commit and commit them, as comparing without them fails.')
+    parser.add_argument('--first-section', type=section_index_or_name, default=None,
+                        help='Index or name of the first section to sample. Defaults to the first section.')
+    parser.add_argument('--last-section', type=section_index_or_name, default=None,
+                        help='Index or name of the last section to sample. Defaults to the last section.')
+    parser.add_argument('--golden', type=Path, default=None,
+                        help='Stored samples to compare against. Defaults to one file per render mode.')
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help='Fail when the mean absolute difference of a sample, on a 0 to 1 scale, exceeds this.')
+    parser.add_argument('--update-golden', action='store_true',
+                        help='Store these samples as the new golden samples instead of comparing.')
+    parser.add_argument('--mode', choices=list(render_mode_settings), default=None,
+                        help='Render mode to sample. Golden samples must be stored in the same mode.')
+    arguments = parser.parse_args()
+    if arguments.mode is not None:
+        set_render_mode(arguments.mode)
+    set_up_configuration()
+    if arguments.golden is None:
+        arguments.golden = default_golden_path()
+    frame_samples = sample_scene_frames(MainScene, SectionRangeSelection(arguments.first_section,
+                                                                         arguments.last_section))
+    if arguments.update_golden:
+        golden_frame_samples = dict(np.load(arguments.golden)) if arguments.golden.exists() else {}
+        # Samples outside the selected sections are kept, so the golden set can be refreshed a range at a time.
+        golden_frame_samples.update(frame_samples)
+        np.savez_compressed(arguments.golden, **golden_frame_samples)
+        print(f'Stored {len(frame_samples)} samples in {arguments.golden}')
+        return
+    if not arguments.golden.exists():
+        # Without golden samples there is nothing to pass against, so this fails rather than silently succeeding.
+        print(f'No golden samples at {arguments.golden}, run with --update-golden from a known good commit and '
+              f'commit them.')
+        sys.exit(1)
+    differences = compare_frame_samples(frame_samples, dict(np.load(arguments.golden)), arguments.tolerance)
+    for difference in differences:
+        print(f'Changed: {difference}')
+    if len(differences) > 0:
+        sys.exit(1)
+    print(f'All {len(frame_samples)} samples match.')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,84 @@
+import argparse
+from pathlib import Path
+from typing import Union
+
+from manim import tempconfig
+
+from neural_network_explanation_presentation_animations.configuration import set_up_configuration, set_render_mode, \
+    render_mode_settings
+from neural_network_explanation_presentation_animations.main_scene import MainScene
+from neural_network_explanation_presentation_animations.render_profiler import profile_render
+from neural_network_explanation_presentation_animations.section_rendering import list_sections, \
+    render_sections_in_parallel
+from neural_network_explanation_presentation_animations.section_snapshots import SectionSnapshotStore
+from neural_network_explanation_presentation_animations.sectioned_scene import SectionRangeSelection
+from neural_network_explanation_presentation_animations.streaming_file_writer import create_streaming_renderer, \
+    streaming_config_overrides
+
+
+def section_index_or_name(value: str) -> Union[int, str]:
+    if value.isdigit():
+        return int(value)
+    return value
+
+
 def main():
-    pass
+    parser = argparse.ArgumentParser(description='Render a range of the sections of the main presentation scene.')
+    parser.add_argument('--first-section', type=section_index_or_name, default=None,
+                        help='Index or name of the first section to render. Defaults to the first section.')
+    parser.add_argument('--last-section', type=section_index_or_name, default=None,
+                        help='Index or name of the last section to render. Defaults to the last section.')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of processes to render sections with.')
+    parser.add_argument('--list-sections', action='store_true',
+                        help='Print the index and name of each section without rendering.')
+    parser.add_argument('--preview', action='store_true',
+                        help='Open the rendered movie when finished.')
+    parser.add_argument('--profile', type=Path, default=None, metavar='REPORT_PATH',
+                        help='Time each section and write a JSON performance report to this path.')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream frames straight to H.264 preview and ProRes master encoders with section markers '
+                             'instead of writing per-section movies.')
+    parser.add_argument('--mode', choices=list(render_mode_settings), default=None,
+                        help='Render mode, which sets the quality, resolution and frame rate. proxy is a fast '
+                             'rehearsal with placeholder text and images and coarser meshes and curves, with the same '
+                             'layout and timing. Defaults to the mode in the environment, or preview.')
+    parser.add_argument('--snapshots', action='store_true',
+                        help='Save a snapshot of the scene state at each section and start from the latest snapshot '
+                             'at or before the first section instead of replaying the sections before it.')
+    arguments = parser.parse_args()
+    if arguments.profile is not None and arguments.workers > 1:
+        parser.error('--profile needs a single worker render.')
+    if arguments.stream and arguments.workers > 1:
+        parser.error('--stream needs a single worker render.')
+    if arguments.snapshots and arguments.workers > 1:
+        parser.error('--snapshots needs a single worker render.')
+    if arguments.mode is not None:
+        set_render_mode(arguments.mode)
+    set_up_configuration()
+    if arguments.list_sections:
+        for section_index, section_name in list_sections(MainScene).items():
+            print(f'{section_index:4} {section_name}')
+        return
+    # Sections before the range are fast-forwarded without rasterizing, rendering stops after the range.
+    section_selection = SectionRangeSelection(arguments.first_section, arguments.last_section)
+    if arguments.workers > 1:
+        render_sections_in_parallel(MainScene, worker_count=arguments.workers, section_selection=section_selection)
+        return
+    scene_kwargs = {}
+    config_overrides = {}
+    if arguments.stream:
+        scene_kwargs['renderer'] = create_streaming_renderer()
+        config_overrides.update(streaming_config_overrides)
+    if arguments.snapshots:
+        scene_kwargs['section_snapshot_store'] = SectionSnapshotStore(MainScene.__name__)
+    # Overrides only last for this render, so nothing else in the process inherits them.
+    with tempconfig(config_overrides):
+        scene = MainScene(section_selection=section_selection, **scene_kwargs)
+        if arguments.profile is not None:
+            profile_render(scene, report_path=arguments.profile, preview=arguments.preview)
+        else:
+            scene.render(preview=arguments.preview)
 
 
 if __name__ == '__main__':
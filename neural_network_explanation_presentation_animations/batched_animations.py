@@ -0,0 +1,228 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from manim import Animation, Mobject, ORIGIN, linear, DEFAULT_LAGGED_START_LAG_RATIO, FadeIn, Group, Scene
+from manim.mobject.types.image_mobject import AbstractImageMobject
+from manim.utils.bezier import interpolate
+from manim.utils.iterables import stretch_array_to_length
+from manim.utils.simple_functions import sigmoid
+
+from neural_network_explanation_presentation_animations.image_assets import SharedImageMobject
+from neural_network_explanation_presentation_animations.template_copy_group import TemplateCopyGroup
+
+# Fill and stroke colours of vectorized mobjects and the colours of point clouds, every other leaf lacks them.
+batched_rgba_names = ('fill_rgbas', 'stroke_rgbas', 'rgbas')
+
+
+def smooth_alphas(alphas: np.ndarray, inflection: float = 10.0) -> np.ndarray:
+    # Array form of manim's `smooth` rate function.
+    error = sigmoid(-inflection / 2)
+    return np.clip((sigmoid(inflection * (np.asarray(alphas) - 0.5)) - error) / (1 - 2 * error), 0, 1)
+
+
+def lagged_start_run_time(lag_count: int, lag_ratio: float) -> float:
+    return (lag_count - 1) * lag_ratio + 1
+
+
+def lagged_start_alphas(alpha: float, lag_indexes: np.ndarray, lag_count: int, lag_ratio: float) -> np.ndarray:
+    # Matches the timing of `LaggedStart` over unit length animations: the i-th starts at i * lag_ratio and the group
+    # lasts until the last one finishes.
+    group_time = alpha * lagged_start_run_time(lag_count, lag_ratio)
+    return np.clip(group_time - np.asarray(lag_indexes) * lag_ratio, 0, 1)
+
+
+def leaves_with_attribute(leaves: Sequence[Mobject], name: str) -> List[int]:
+    return [leaf_index for leaf_index, leaf in enumerate(leaves) if hasattr(leaf, name)]
+
+
+def concatenate_into_views(leaves: Sequence[Mobject], name: str) -> np.ndarray:
+    # The leaves are rebound to views of one buffer, so the buffer can be written to in a single operation.
+    arrays = [getattr(leaf, name) for leaf in leaves]
+    buffer = np.concatenate(arrays) if len(arrays) > 0 else np.zeros((0, 3 if name == 'points' else 4))
+    starts = np.cumsum([0, *[len(array) for array in arrays]])
+    for leaf, start, end in zip(leaves, starts[:-1], starts[1:]):
+        setattr(leaf, name, buffer[start:end])
+    return buffer
+
+
+class BatchedLaggedFadeIn(Animation):
+    def __init__(self, *mobjects: Mobject, shift: np.ndarray = ORIGIN,
+                 lag_ratio: float = DEFAULT_LAGGED_START_LAG_RATIO, lag_indexes: Optional[np.ndarray] = None,
+                 lag_count: Optional[int] = None,
+                 instance_rate_func: Callable[[np.ndarray], np.ndarray] = smooth_alphas,
+                 run_time: Optional[float] = None, **kwargs):
+        # By default each mobject gets its own lag slot in order. Explicit slots let several animations played
+        # together interleave within one lagged start.
+        if lag_indexes is None:
+            lag_indexes = np.arange(len(mobjects))
+        if lag_count is None:
+            lag_count = int(np.max(lag_indexes, initial=0)) + 1
+        if run_time is None:
+            run_time = lagged_start_run_time(lag_count, lag_ratio)
+        self.faded_mobjects: List[Mobject] = list(mobjects)
+        self.lag_indexes: np.ndarray = np.asarray(lag_indexes)
+        self.lag_count: int = lag_count
+        # Either one shift for every mobject or one per mobject.
+        self.shift_vectors: np.ndarray = np.broadcast_to(np.asarray(shift, dtype=float), (len(mobjects), 3))
+        self.lag_ratio_between_mobjects: float = lag_ratio
+        self.instance_rate_func: Callable[[np.ndarray], np.ndarray] = instance_rate_func
+        self.buffers: Dict[str, np.ndarray] = {}
+        # Not an introducer, so the scene adds the wrapping group before working out which mobjects move. Otherwise
+        # nothing would count as moving and every frame would redraw the whole scene over its static image.
+        super().__init__(Group(*mobjects), run_time=run_time, rate_func=linear, **kwargs)
+
+    @classmethod
+    def from_fade_ins(cls, fade_ins: Sequence[FadeIn], **kwargs) -> 'BatchedLaggedFadeIn':
+        # Takes over the mobjects and shifts of plain `FadeIn`s, such as those meant for a `LaggedStart`.
+        for fade_in in fade_ins:
+            if fade_in.point_target or fade_in.scale_factor != 1:
+                raise Exception(f'Only shifting fade ins can be batched, got {fade_in}.')
+        return cls(*[fade_in.mobject for fade_in in fade_ins],
+                   shift=np.array([fade_in.shift_vector for fade_in in fade_ins]).reshape(-1, 3), **kwargs)
+
+    def begin(self):
+        # Every leaf's arrays are concatenated into one buffer per attribute and the leaves are rebound to views of
+        # it, with each buffer row remembering which mobject (and so which lag slot) it belongs to.
+        leaves: List[Mobject] = []
+        leaf_mobject_indexes: List[int] = []
+        for mobject_index, mobject in enumerate(self.faded_mobjects):
+            for leaf in mobject.family_members_with_points():
+                leaves.append(leaf)
+                leaf_mobject_indexes.append(mobject_index)
+        self.row_mobject_indexes: Dict[str, np.ndarray] = {}
+        for name in ('points', *batched_rgba_names):
+            named_leaf_indexes = leaves_with_attribute(leaves, name)
+            named_leaves = [leaves[leaf_index] for leaf_index in named_leaf_indexes]
+            named_leaf_mobject_indexes = [leaf_mobject_indexes[leaf_index] for leaf_index in named_leaf_indexes]
+            lengths = [len(getattr(leaf, name)) for leaf in named_leaves]
+            self.buffers[name] = concatenate_into_views(named_leaves, name)
+            self.row_mobject_indexes[name] = np.repeat(np.array(named_leaf_mobject_indexes, dtype=int), lengths)
+        self.target_points: np.ndarray = self.buffers['points'].copy()
+        self.row_shift_vectors: np.ndarray = self.shift_vectors[self.row_mobject_indexes['points']]
+        self.target_opacities: Dict[str, np.ndarray] = {name: self.buffers[name][:, 3].copy()
+                                                        for name in batched_rgba_names}
+        # Images keep their opacity in their pixels, which are faded one image at a time.
+        self.image_leaves: List[Tuple[AbstractImageMobject, int, np.ndarray]] = []
+        for leaf, mobject_index in zip(leaves, leaf_mobject_indexes):
+            if isinstance(leaf, AbstractImageMobject):
+                if isinstance(leaf, SharedImageMobject):
+                    leaf.ensure_private_pixel_array()
+                self.image_leaves.append((leaf, mobject_index, leaf.pixel_array[:, :, 3].copy()))
+        super().begin()
+
+    def create_starting_mobject(self) -> Mobject:
+        return Mobject()
+
+    def interpolate_mobject(self, alpha: float) -> None:
+        mobject_alphas = self.instance_rate_func(
+            lagged_start_alphas(alpha, self.lag_indexes, self.lag_count, self.lag_ratio_between_mobjects))
+        point_alphas = mobject_alphas[self.row_mobject_indexes['points']]
+        self.buffers['points'][:] = self.target_points - (1 - point_alphas)[:, None] * self.row_shift_vectors
+        for name in batched_rgba_names:
+            self.buffers[name][:, 3] = self.target_opacities[name] * mobject_alphas[self.row_mobject_indexes[name]]
+        for leaf, mobject_index, target_pixel_opacities in self.image_leaves:
+            leaf.pixel_array[:, :, 3] = target_pixel_opacities * mobject_alphas[mobject_index]
+
+    def clean_up_from_scene(self, scene: Scene) -> None:
+        super().clean_up_from_scene(scene)
+        # The mobjects stay in the scene individually, as the fade ins would have left them, not inside the wrapper.
+        scene.remove(self.mobject)
+        scene.add(*self.faded_mobjects)
+
+
+class TemplateCopyLaggedFadeIn(BatchedLaggedFadeIn):
+    def __init__(self, template_copy_group: TemplateCopyGroup, shift: np.ndarray = ORIGIN,
+                 copy_indexes: Optional[np.ndarray] = None, **kwargs):
+        # Fades in the selected copies of the group, taking the lag slots and timing of `BatchedLaggedFadeIn`.
+        if copy_indexes is None:
+            copy_indexes = np.arange(template_copy_group.copy_count)
+        self.template_copy_group: TemplateCopyGroup = template_copy_group
+        self.copy_indexes: np.ndarray = np.asarray(copy_indexes)
+        super().__init__(*[template_copy_group.submobjects[copy_index] for copy_index in self.copy_indexes],
+                         shift=shift, **kwargs)
+
+
+class BatchedReplacementTransform(Animation):
+    def __init__(self, sources: Sequence[Mobject], targets: Sequence[Mobject], **kwargs):
+        if len(sources) != len(targets):
+            raise Exception(f'Got {len(sources)} sources for {len(targets)} targets.')
+        self.sources: List[Mobject] = list(sources)
+        self.targets: List[Mobject] = list(targets)
+        self.source_leaves: List[Mobject] = []
+        self.target_leaves: List[Mobject] = []
+        for source, target in zip(self.sources, self.targets):
+            source_leaves = source.family_members_with_points()
+            target_leaves = target.family_members_with_points()
+            # Points are interpolated row for row, so no pair is aligned (and copied) the way `Transform` would.
+            if [len(leaf.points) for leaf in source_leaves] != [len(leaf.points) for leaf in target_leaves]:
+                raise Exception(f'{source} and {target} do not share a point layout, use a ReplacementTransform.')
+            for source_leaf, target_leaf in zip(source_leaves, target_leaves):
+                if ([hasattr(source_leaf, name) for name in batched_rgba_names] !=
+                        [hasattr(target_leaf, name) for name in batched_rgba_names] or
+                        getattr(source_leaf, 'pixel_array', np.zeros(0)).shape !=
+                        getattr(target_leaf, 'pixel_array', np.zeros(0)).shape):
+                    raise Exception(f'{source_leaf} and {target_leaf} are not the same kind of mobject, use a '
+                                    f'ReplacementTransform.')
+            self.source_leaves.extend(source_leaves)
+            self.target_leaves.extend(target_leaves)
+        self.buffers: Dict[str, np.ndarray] = {}
+        self.start_buffers: Dict[str, np.ndarray] = {}
+        self.difference_buffers: Dict[str, np.ndarray] = {}
+        # As with `BatchedLaggedFadeIn`, the scene adds the wrapping group, so the sources are drawn as moving rather
+        # than also being baked into the static image.
+        super().__init__(Group(*self.sources), **kwargs)
+
+    def begin(self):
+        for name in ('points', *batched_rgba_names):
+            named_leaf_indexes = leaves_with_attribute(self.source_leaves, name)
+            self.buffers[name] = concatenate_into_views([self.source_leaves[leaf_index]
+                                                         for leaf_index in named_leaf_indexes], name)
+            target_arrays = [self.target_leaves[leaf_index].points if name == 'points' else
+                             stretch_array_to_length(getattr(self.target_leaves[leaf_index], name),
+                                                     len(getattr(self.source_leaves[leaf_index], name)))
+                             for leaf_index in named_leaf_indexes]
+            self.start_buffers[name] = self.buffers[name].copy()
+            # Preallocated once, every frame is then written as start + alpha * difference in place.
+            self.difference_buffers[name] = (np.concatenate(target_arrays) if len(target_arrays) > 0 else
+                                             np.zeros_like(self.start_buffers[name]))
+            self.difference_buffers[name] -= self.start_buffers[name]
+        self.start_stroke_widths: np.ndarray = np.array(
+            [getattr(leaf, 'stroke_width', 0) for leaf in self.source_leaves], dtype=float)
+        self.target_stroke_widths: np.ndarray = np.array(
+            [getattr(leaf, 'stroke_width', 0) for leaf in self.target_leaves], dtype=float)
+        # Images blend their pixels one image at a time, shared images stop identifying as their asset first.
+        for source_leaf in self.source_leaves:
+            if isinstance(source_leaf, SharedImageMobject):
+                source_leaf.ensure_private_pixel_array()
+        self.image_leaf_pixel_arrays: List[Tuple[AbstractImageMobject, np.ndarray, np.ndarray]] = [
+            (source_leaf, np.array(source_leaf.pixel_array), np.array(target_leaf.pixel_array))
+            for source_leaf, target_leaf in zip(self.source_leaves, self.target_leaves)
+            if isinstance(source_leaf, AbstractImageMobject)]
+        self.changed_stroke_width_indexes: np.ndarray = np.flatnonzero(self.start_stroke_widths !=
+                                                                       self.target_stroke_widths)
+        super().begin()
+
+    def create_starting_mobject(self) -> Mobject:
+        # The start is kept in the preallocated buffers rather than in a deep copy of every source.
+        return Mobject()
+
+    def interpolate_mobject(self, alpha: float) -> None:
+        alpha = self.rate_func(alpha)
+        for name, buffer in self.buffers.items():
+            np.multiply(self.difference_buffers[name], alpha, out=buffer)
+            buffer += self.start_buffers[name]
+        for leaf_index in self.changed_stroke_width_indexes:
+            self.source_leaves[leaf_index].stroke_width = (
+                self.start_stroke_widths[leaf_index] +
+                alpha * (self.target_stroke_widths[leaf_index] - self.start_stroke_widths[leaf_index]))
+        for source_leaf, start_pixel_array, target_pixel_array in self.image_leaf_pixel_arrays:
+            source_leaf.pixel_array = interpolate(start_pixel_array, target_pixel_array, alpha).astype(
+                start_pixel_array.dtype)
+
+    def clean_up_from_scene(self, scene: Scene) -> None:
+        super().clean_up_from_scene(scene)
+        scene.remove(self.mobject)
+        # As with `ReplacementTransform`, each target takes its source's place once the morph is done.
+        for source, target in zip(self.sources, self.targets):
+            scene.remove(source)
+            scene.add(target)
@@ -1,10 +1,59 @@
+import os
+from typing import Dict, Optional
+
 from manim import config, rgb_to_color
 
+render_mode_environment_variable = 'NEURAL_NETWORK_PRESENTATION_RENDER_MODE'
+
+
+class RenderModeSettings:
+    def __init__(self, quality: str, pixel_width: Optional[int] = None, pixel_height: Optional[int] = None,
+                 frame_rate: Optional[int] = None):
+        self.quality: str = quality
+        # Overrides of the quality's own resolution and frame rate.
+        self.pixel_width: Optional[int] = pixel_width
+        self.pixel_height: Optional[int] = pixel_height
+        self.frame_rate: Optional[int] = frame_rate
+
+
+# Only the pixel resolution and frame rate change between modes, the frame size in scene units (so the layout) and
+# every animation's timing stay the same. Proxy renders also use placeholder text and images and coarser meshes.
+render_mode_settings: Dict[str, RenderModeSettings] = {
+    'proxy': RenderModeSettings('low_quality', pixel_width=480, pixel_height=270, frame_rate=10),
+    'preview': RenderModeSettings('low_quality'),
+    'final': RenderModeSettings('production_quality'),
+}
+default_render_mode = 'preview'
+
+
+def get_render_mode() -> str:
+    # An environment variable, so that spawned render workers follow the same mode as the process that started them.
+    render_mode = os.environ.get(render_mode_environment_variable, default_render_mode)
+    if render_mode not in render_mode_settings:
+        raise Exception(f'Unknown render mode {render_mode}, expected one of {", ".join(render_mode_settings)}.')
+    return render_mode
+
+
+def set_render_mode(render_mode: str):
+    if render_mode not in render_mode_settings:
+        raise Exception(f'Unknown render mode {render_mode}, expected one of {", ".join(render_mode_settings)}.')
+    os.environ[render_mode_environment_variable] = render_mode
+
+
+def is_proxy_render() -> bool:
+    return get_render_mode() == 'proxy'
+
 
 def set_up_configuration():
     config.background_color = rgb_to_color([235 / 255, 235 / 255, 235 / 255])
-    config.quality = 'low_quality'
+    settings = render_mode_settings[get_render_mode()]
+    config.quality = settings.quality
+    if settings.pixel_width is not None:
+        config.pixel_width = settings.pixel_width
+    if settings.pixel_height is not None:
+        config.pixel_height = settings.pixel_height
+    if settings.frame_rate is not None:
+        config.frame_rate = settings.frame_rate
     # config.background_opacity = 0
     # config.movie_file_extension = '.mov'
     config.save_sections = True
-
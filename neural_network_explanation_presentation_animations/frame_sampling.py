@@ -0,0 +1,100 @@
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+from manim import tempconfig, DefaultSectionType
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.scene.scene_file_writer import SceneFileWriter
+from manim.scene.section import Section
+
+from neural_network_explanation_presentation_animations.sectioned_scene import SectionedScene, SectionSelection
+
+default_sample_shape = (36, 64)
+
+
+def downsample_frame(frame: np.ndarray, sample_shape: Tuple[int, int] = default_sample_shape) -> np.ndarray:
+    # Block means over a fixed grid, so small antialiasing differences average out and samples stay comparable
+    # across pixel resolutions.
+    frame = frame.astype(np.float64) / 255
+    row_starts = np.linspace(0, frame.shape[0], sample_shape[0] + 1).astype(int)
+    column_starts = np.linspace(0, frame.shape[1], sample_shape[1] + 1).astype(int)
+    row_sums = np.add.reduceat(frame, row_starts[:-1], axis=0)
+    block_sums = np.add.reduceat(row_sums, column_starts[:-1], axis=1)
+    block_areas = np.outer(np.diff(row_starts), np.diff(column_starts))[..., np.newaxis]
+    return (block_sums / block_areas).astype(np.float32)
+
+
+class FrameSamplingSceneFileWriter(SceneFileWriter):
+    def __init__(self, renderer, scene_name: str, **kwargs):
+        # Set before the base initializer, which opens the first section.
+        self.frame_samples: Dict[str, np.ndarray] = {}
+        self.sample_name_prefix: Optional[str] = None
+        self.awaiting_first_frame: bool = False
+        self.last_frame: Optional[np.ndarray] = None
+        super().__init__(renderer, scene_name, **kwargs)
+
+    def store_last_frame(self):
+        if self.sample_name_prefix is not None and self.last_frame is not None:
+            self.frame_samples[f'{self.sample_name_prefix}_last'] = downsample_frame(self.last_frame)
+        self.last_frame = None
+
+    def next_section(self, name: str = 'unnamed', type: str = DefaultSectionType.NORMAL,
+                     skip_animations: bool = False) -> None:
+        self.store_last_frame()
+        # Numbered like the scene's sections, the automatic first section comes before section 0.
+        self.sample_name_prefix = f'{len(self.sections) - 1:04}_{name}'
+        self.awaiting_first_frame = True
+        # Nothing is encoded, sections only delimit the sampled frames.
+        self.sections.append(Section(type, None, name, skip_animations))
+
+    def begin_animation(self, allow_write: bool = False, file_path=None):
+        pass
+
+    def end_animation(self, allow_write: bool = False):
+        pass
+
+    def write_frame(self, frame_or_renderer):
+        if self.awaiting_first_frame:
+            self.frame_samples[f'{self.sample_name_prefix}_first'] = downsample_frame(frame_or_renderer)
+            self.awaiting_first_frame = False
+        self.last_frame = frame_or_renderer
+
+    def finish(self):
+        self.store_last_frame()
+
+
+class FrameSamplingRenderer(CairoRenderer):
+    def __init__(self, **kwargs):
+        super().__init__(file_writer_class=FrameSamplingSceneFileWriter, **kwargs)
+
+    def render(self, scene, time, moving_mobjects):
+        # Only a section's first frame and the last frame of each animation can become samples, every other frame
+        # advances the clock without being rasterized.
+        is_last_frame = time + (1 / self.camera.frame_rate) >= scene.duration - 1e-9
+        if self.file_writer.awaiting_first_frame or is_last_frame:
+            super().render(scene, time, moving_mobjects)
+        elif not self.skip_animations:
+            self.time += 1 / self.camera.frame_rate
+
+
+def sample_scene_frames(scene_class: Type[SectionedScene], section_selection: Optional[SectionSelection] = None
+                        ) -> Dict[str, np.ndarray]:
+    with tempconfig({'disable_caching': True, 'save_sections': False, 'save_last_frame': False}):
+        scene = scene_class(renderer=FrameSamplingRenderer(), section_selection=section_selection)
+        scene.render()
+    return scene.renderer.file_writer.frame_samples
+
+
+def compare_frame_samples(frame_samples: Dict[str, np.ndarray], golden_frame_samples: Dict[str, np.ndarray],
+                          tolerance: float) -> List[str]:
+    differences = []
+    for sample_name, frame_sample in frame_samples.items():
+        golden_frame_sample = golden_frame_samples.get(sample_name)
+        if golden_frame_sample is None:
+            differences.append(f'{sample_name}: not in the golden samples')
+        elif golden_frame_sample.shape != frame_sample.shape:
+            differences.append(f'{sample_name}: shape {frame_sample.shape} vs golden {golden_frame_sample.shape}')
+        else:
+            mean_difference = float(np.abs(frame_sample - golden_frame_sample).mean())
+            if mean_difference > tolerance:
+                differences.append(f'{sample_name}: mean difference {mean_difference:.4f} exceeds {tolerance:.4f}')
+    return differences
@@ -0,0 +1,110 @@
+import hashlib
+import math
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+from manim import ImageMobject, config
+from manim.constants import QUALITIES, DEFAULT_QUALITY
+from manim.mobject.types.image_mobject import AbstractImageMobject
+
+from neural_network_explanation_presentation_animations.configuration import is_proxy_render
+
+proxy_image_scale: float = 0.25
+
+
+class SharedImageMobject(ImageMobject):
+    def __init__(self, pixel_array: np.ndarray, **kwargs):
+        # Skips `ImageMobject.__init__`, which would copy the shared buffer into a private array.
+        self.fill_opacity = 1
+        self.stroke_opacity = 1
+        self.invert = False
+        self.image_mode = 'RGBA'
+        self.pixel_array = pixel_array
+        # Identifies the shared pixels for scene fingerprints, cleared once this mobject has its own copy.
+        self.asset_key: Optional[str] = None
+        AbstractImageMobject.__init__(self, scale_to_resolution=QUALITIES[DEFAULT_QUALITY]['pixel_height'], **kwargs)
+
+    def ensure_private_pixel_array(self):
+        # Copy on write, the shared buffer is read-only.
+        if not self.pixel_array.flags.writeable:
+            self.pixel_array = np.array(self.pixel_array)
+            self.asset_key = None
+
+    def set_color(self, color, alpha=None, family=True):
+        self.ensure_private_pixel_array()
+        return super().set_color(color, alpha=alpha, family=family)
+
+    def set_opacity(self, alpha):
+        self.ensure_private_pixel_array()
+        return super().set_opacity(alpha)
+
+    def fade(self, darkness=0.5, family=True):
+        self.ensure_private_pixel_array()
+        return super().fade(darkness=darkness, family=family)
+
+
+class ImageAssetRegistry:
+    def __init__(self, cache_directory: Optional[Path] = None):
+        # Without a directory, the cache follows `config.media_dir` at the time of use, like the other caches.
+        self.cache_directory: Optional[Path] = cache_directory
+        self.pixel_arrays: Dict[Tuple[Path, int], np.ndarray] = {}
+
+    def get_cache_directory(self) -> Path:
+        if self.cache_directory is None:
+            return Path(config.media_dir).joinpath('image_asset_cache')
+        return self.cache_directory
+
+    def cache_path(self, image_path: Path, maximum_pixel_width: int) -> Path:
+        image_stat = image_path.stat()
+        hasher = hashlib.sha256(f'{image_path}:{image_stat.st_size}:{image_stat.st_mtime_ns}:{maximum_pixel_width}'
+                                .encode())
+        return self.get_cache_directory().joinpath(f'{image_path.stem}_{hasher.hexdigest()[:16]}.npy')
+
+    def load_pixel_array(self, image_path: Path, maximum_pixel_width: int) -> np.ndarray:
+        image_path = image_path.resolve()
+        key = (image_path, maximum_pixel_width)
+        pixel_array = self.pixel_arrays.get(key)
+        if pixel_array is not None:
+            return pixel_array
+        cache_path = self.cache_path(image_path, maximum_pixel_width)
+        if not cache_path.exists():
+            with Image.open(image_path) as opened_image:
+                image = opened_image.convert('RGBA')
+            if image.width > maximum_pixel_width:
+                image = image.resize((maximum_pixel_width, round(image.height * maximum_pixel_width / image.width)),
+                                     Image.LANCZOS)
+            self.get_cache_directory().mkdir(parents=True, exist_ok=True)
+            temporary_cache_path = cache_path.with_name(f'{cache_path.stem}.{os.getpid()}.tmp.npy')
+            np.save(temporary_cache_path, np.asarray(image))
+            os.replace(temporary_cache_path, cache_path)
+        # Memory mapping lets every process rendering the deck share the same physical pages.
+        pixel_array = np.load(cache_path, mmap_mode='r')
+        self.pixel_arrays[key] = pixel_array
+        return pixel_array
+
+    def create_image_mobject(self, image_path: Path, width: Optional[float] = None,
+                             height: Optional[float] = None) -> SharedImageMobject:
+        with Image.open(image_path) as image:  # Only reads the header.
+            image_pixel_width, image_pixel_height = image.size
+        if width is None and height is None:
+            # The image's natural size, as `ImageMobject` would show it.
+            height = image_pixel_height / QUALITIES[DEFAULT_QUALITY]['pixel_height'] * config.frame_height
+        if width is None:
+            width = height * image_pixel_width / image_pixel_height
+        maximum_pixel_width = math.ceil(width / config.frame_width * config.pixel_width)
+        if is_proxy_render():
+            maximum_pixel_width = max(math.ceil(maximum_pixel_width * proxy_image_scale), 16)
+        image_mobject = SharedImageMobject(self.load_pixel_array(image_path, maximum_pixel_width))
+        # The cache path is derived from the file's path, size, modification time and the downsampled width.
+        image_mobject.asset_key = self.cache_path(image_path.resolve(), maximum_pixel_width).name
+        if height is None:
+            image_mobject.scale_to_fit_width(width)
+        else:
+            image_mobject.scale_to_fit_height(height)
+        return image_mobject
+
+
+image_asset_registry = ImageAssetRegistry()
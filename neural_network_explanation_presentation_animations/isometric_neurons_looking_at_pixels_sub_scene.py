@@ -2,26 +2,40 @@ from __future__ import annotations
 
 import math
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, Iterator, List, Tuple
 
 import numpy as np
-from manim import ImageMobject, Mobject, Polygon, FadeIn, BLACK, Circle, RED, DOWN, Animation, UP, VGroup
+from manim import ImageMobject, Polygon, BLACK, Circle, RED, VGroup
+
+from neural_network_explanation_presentation_animations.image_assets import image_asset_registry
+from neural_network_explanation_presentation_animations.isometric_projection import IsometricProjection
+from neural_network_explanation_presentation_animations.level_of_detail import arc_component_count
+from neural_network_explanation_presentation_animations.pixel_grid import PixelGrid
+
+quad_corner_offsets = np.array([[0, 0], [1, 0], [1, 1], [0, 1]])
 
 
 class IsometricNeuronsLookingAtPixelsSubScene:
-    def __init__(self):
-        self.image_large_size = 6.0
-        self.number_of_pixels = 10
+    def __init__(self, number_of_pixels: int = 10, image_large_size: float = 6.0,
+                 isometric_theta: float = -math.tau / 8, isometric_scale: float = 0.5,
+                 isometric_y_base_shift: float = -1, isometric_y_per_z_shift: float = 1, kernel_size: int = 3,
+                 stride: int = 1, padding: int = 0):
+        self.image_large_size = image_large_size
+        self.number_of_pixels = number_of_pixels
         assert self.number_of_pixels % 2 == 0
+        self.kernel_size = kernel_size
+        self.stride = stride
+        self.padding = padding
+        assert self.neuron_grid_size() > 0
         self.pixel_size = self.image_large_size / self.number_of_pixels
         self.skip_animations = False
-        self.isometric_theta = -math.tau / 8
-        self.isometric_scale = 0.5
-        self.isometric_y_base_shift = -1
-        self.isometric_y_per_z_shift = 1
+        self.isometric_theta = isometric_theta
+        self.isometric_scale = isometric_scale
+        self.isometric_y_base_shift = isometric_y_base_shift
+        self.isometric_y_per_z_shift = isometric_y_per_z_shift
+        self.isometric_projection = IsometricProjection(isometric_theta, isometric_scale, isometric_y_base_shift,
+                                                        isometric_y_per_z_shift)
         self.neuron_radius = self.pixel_size * 0.4
-        self.cartesian_pixel_grid_v_group = VGroup()
-        self.isometric_pixel_grid_v_group = VGroup()
         self.neuron_groups_v_group = VGroup()
         self.v_group = VGroup()
 
@@ -33,52 +47,36 @@ class IsometricNeuronsLookingAtPixelsSubScene:
         self.v_group.add(self.cartesian_neuron, self.cartesian_neuron_kernel)
         super().__init__()
 
+    def neuron_grid_size(self) -> int:
+        # The usual convolution output size, one neuron per position where the kernel fits in the padded image.
+        return (self.number_of_pixels + 2 * self.padding - self.kernel_size) // self.stride + 1
+
+    def neuron_index_to_kernel_center_pixel_index(self, neuron_index: np.ndarray) -> np.ndarray:
+        # The kernel of neuron i covers the pixels from i * stride - padding up to kernel_size pixels further.
+        return (neuron_index * self.stride) - self.padding + (self.kernel_size / 2) - 0.5
+
     def create_cartesian_neuron_collection(self):
-        cartesian_neuron_position = self.pixel_index_to_pixel_center_cartesian_xy(pixel_x_index=1, pixel_y_index=1)
+        first_neuron_pixel_index = self.neuron_index_to_kernel_center_pixel_index(0)
+        cartesian_neuron_position = self.pixel_index_to_pixel_center_cartesian_xy(
+            pixel_x_index=first_neuron_pixel_index, pixel_y_index=first_neuron_pixel_index)
         cartesian_neuron = self.create_neuron([cartesian_neuron_position[0], cartesian_neuron_position[1], 1])
-        cartesian_neuron_kernel = self.create_neuron_kernel_centered_on_pixel_index(pixel_x_index=1, pixel_y_index=1,
-                                                                                    isometric=False)
+        cartesian_neuron_kernel = self.create_neuron_kernel_centered_on_pixel_index(
+            pixel_x_index=first_neuron_pixel_index, pixel_y_index=first_neuron_pixel_index, isometric=False)
         return cartesian_neuron, cartesian_neuron_kernel
 
-    def create_grids_and_neuron_groups(self) -> (List[Mobject], List[Mobject], List[List[NeuronGroup]]):
-        cartesian_pixel_grid: List[Mobject] = []
-        isometric_pixel_grid: List[Mobject] = []
-        neuron_groups: List[List[NeuronGroup]] = []
-        for pixel_y_index in range(self.number_of_pixels):
-            if pixel_y_index != 0 and pixel_y_index != self.number_of_pixels - 1:
-                neuron_groups.append([])
-            for pixel_x_index in range(self.number_of_pixels):
-                left, top = self.pixel_index_to_pixel_start_cartesian_xy(pixel_x_index, pixel_y_index)
-                right = left + self.pixel_size
-                bottom = top - self.pixel_size
-                polygon_cartesian_positions = [
-                    [left, top, 0],
-                    [right, top, 0],
-                    [right, bottom, 0],
-                    [left, bottom, 0],
-                ]
-                polygon_isometric_positions = self.from_cartesian_position_to_isometric_position(
-                    np.array(polygon_cartesian_positions))
-                cartesian_polygon = self.create_pixel_grid_polygon(polygon_cartesian_positions)
-                cartesian_pixel_grid.append(cartesian_polygon)
-                self.v_group.add(cartesian_polygon)
-                self.cartesian_pixel_grid_v_group.add(cartesian_polygon)
-                isometric_polygon = self.create_pixel_grid_polygon(polygon_isometric_positions)
-                isometric_pixel_grid.append(isometric_polygon)
-                self.v_group.add(isometric_polygon)
-                self.isometric_pixel_grid_v_group.add(isometric_polygon)
-                if (pixel_x_index != 0 and pixel_x_index != self.number_of_pixels - 1 and
-                        pixel_y_index != 0 and pixel_y_index != self.number_of_pixels - 1):
-                    neuron_group = NeuronGroup(self, pixel_x_index, pixel_y_index)
-                    neuron_groups[pixel_y_index - 1].append(neuron_group)
-                    self.v_group.add(neuron_group.v_group)
-                    self.neuron_groups_v_group.add(neuron_group.v_group)
+    def create_grids_and_neuron_groups(self) -> (PixelGrid, PixelGrid, NeuronGroupGrid):
+        grid_geometry = IsometricGridGeometry(self)
+        cartesian_pixel_grid = self.create_pixel_grid(grid_geometry.cartesian_pixel_positions)
+        self.v_group.add(cartesian_pixel_grid)
+        isometric_pixel_grid = self.create_pixel_grid(grid_geometry.isometric_pixel_positions)
+        self.v_group.add(isometric_pixel_grid)
+        neuron_groups = NeuronGroupGrid(self, grid_geometry)
         return cartesian_pixel_grid, isometric_pixel_grid, neuron_groups
 
     def create_image(self) -> ImageMobject:
-        planetary_nebula_image_mobject = ImageMobject(
-            Path('neural_network_explanation_presentation_animations/images/grayscale_ngc7293_planetary_nebula.jpg'))
-        planetary_nebula_image_mobject.scale_to_fit_width(self.image_large_size)
+        planetary_nebula_image_mobject = image_asset_registry.create_image_mobject(
+            Path('neural_network_explanation_presentation_animations/images/grayscale_ngc7293_planetary_nebula.jpg'),
+            width=self.image_large_size)
         return planetary_nebula_image_mobject
 
     def pixel_index_to_pixel_center_cartesian_xy(self, pixel_x_index: float, pixel_y_index: float) -> (float, float):
@@ -91,136 +89,153 @@ class IsometricNeuronsLookingAtPixelsSubScene:
         cartesian_y_position = (self.image_large_size / 2) - (pixel_y_index * self.pixel_size)
         return cartesian_x_position, cartesian_y_position
 
-    def pixel_index_to_pixel_start_isometric_position(self, pixel_x_index: float, pixel_y_index: float,
-                                                      z_position: float = 0) -> np.ndarray:
-        cartesian_x_position = (-self.image_large_size / 2) + (pixel_x_index * self.pixel_size)
-        cartesian_y_position = (self.image_large_size / 2) - (pixel_y_index * self.pixel_size)
-        isometric_position = self.from_cartesian_position_to_isometric_position(
-            np.array([cartesian_x_position, cartesian_y_position, z_position]))
-        return isometric_position
-
-    def from_cartesian_position_to_isometric_position(self, cartesian_position: np.ndarray) -> np.ndarray:
-        if len(cartesian_position.shape) == 1:
-            cartesian_xy_position = cartesian_position[:2]
-            cartesian_z_position = cartesian_position[[2]]
-        else:
-            cartesian_xy_position = cartesian_position[:, :2]
-            cartesian_z_position = cartesian_position[:, [2]]
-        rotation = np.array([[np.cos(self.isometric_theta), - np.sin(self.isometric_theta)],
-                             [np.sin(self.isometric_theta), np.cos(self.isometric_theta)]])
-        rotated_position = cartesian_xy_position.dot(rotation)
-        if len(cartesian_position.shape) == 1:
-            non_shifted_isometric_xy_position = np.array([rotated_position[0],
-                                                          rotated_position[1] * self.isometric_scale])
-            non_shifted_isometric_position = np.concatenate([non_shifted_isometric_xy_position,
-                                                             cartesian_z_position], axis=0)
-            isometric_position = non_shifted_isometric_position
-            y_shift = self.isometric_y_base_shift + (isometric_position[2] * self.isometric_y_per_z_shift)
-            isometric_position[1] += y_shift
-        else:
-            non_shifted_isometric_xy_position = np.stack([rotated_position[:, 0],
-                                                          rotated_position[:, 1] * self.isometric_scale], axis=1)
-            non_shifted_isometric_position = np.concatenate([non_shifted_isometric_xy_position,
-                                                             cartesian_z_position], axis=1)
-            isometric_position = non_shifted_isometric_position
-            y_shift = self.isometric_y_base_shift + (isometric_position[:, 2] * self.isometric_y_per_z_shift)
-            isometric_position[:, 1] += y_shift
-        return isometric_position
+    def pixel_indexes_to_quad_cartesian_positions(self, center_pixel_x_indexes: np.ndarray,
+                                                  center_pixel_y_indexes: np.ndarray, size_in_pixels: float,
+                                                  z_position: float) -> np.ndarray:
+        start_pixel_x_indexes = center_pixel_x_indexes - (size_in_pixels / 2)
+        start_pixel_y_indexes = center_pixel_y_indexes - (size_in_pixels / 2)
+        corner_pixel_x_indexes = start_pixel_x_indexes[..., np.newaxis] + (quad_corner_offsets[:, 0] * size_in_pixels)
+        corner_pixel_y_indexes = start_pixel_y_indexes[..., np.newaxis] + (quad_corner_offsets[:, 1] * size_in_pixels)
+        cartesian_x_positions, cartesian_y_positions = self.pixel_index_to_pixel_start_cartesian_xy(
+            corner_pixel_x_indexes, corner_pixel_y_indexes)
+        z_positions = np.full_like(cartesian_x_positions, z_position)
+        return np.stack([cartesian_x_positions, cartesian_y_positions, z_positions], axis=-1)
+
+    def from_cartesian_positions_to_isometric_positions(self, cartesian_positions: np.ndarray) -> np.ndarray:
+        return self.isometric_projection.apply(cartesian_positions)
 
     @staticmethod
-    def create_pixel_grid_polygon(vertexes: Union[np.ndarray, List[List[float]]]) -> Polygon:
-        polygon = Polygon(*vertexes, color=BLACK)
-        return polygon
-
-    def create_neuron_above_pixel_position(self, pixel_x_index, pixel_y_index) -> Circle:
-        isometric_position = self.pixel_index_to_pixel_start_isometric_position(pixel_x_index + 0.5,
-                                                                                pixel_y_index + 0.5,
-                                                                                z_position=1)
-        isometric_position[2] = 1  # Z position for occlusions.
-        circle = self.create_neuron(position=isometric_position)
-        return circle
+    def create_pixel_grid(cell_corner_positions: np.ndarray) -> PixelGrid:
+        pixel_grid = PixelGrid(cell_corner_positions, stroke_color=BLACK)
+        return pixel_grid
 
     def create_neuron(self, position) -> Circle:
-        circle = Circle(radius=self.neuron_radius, stroke_color=BLACK, fill_color=RED, fill_opacity=1.0)
+        circle = Circle(radius=self.neuron_radius, stroke_color=BLACK, fill_color=RED, fill_opacity=1.0,
+                        num_components=arc_component_count())
         circle.move_to(position)
         return circle
 
     def create_neuron_kernel_centered_on_pixel_index(self, pixel_x_index: float, pixel_y_index: float,
                                                      isometric: bool = True) -> Polygon:
-        kernel_size = 3
-        center_pixel_x_index = pixel_x_index + 0.5
-        center_pixel_y_index = pixel_y_index + 0.5
-        start_pixel_x_index = center_pixel_x_index - (kernel_size / 2)
-        start_pixel_y_index = center_pixel_y_index - (kernel_size / 2)
-        end_pixel_x_index = center_pixel_x_index + (kernel_size / 2)
-        end_pixel_y_index = center_pixel_y_index + (kernel_size / 2)
-        start_cartesian_position = self.pixel_index_to_pixel_start_cartesian_xy(start_pixel_x_index,
-                                                                                start_pixel_y_index)
-        end_cartesian_position = self.pixel_index_to_pixel_start_cartesian_xy(end_pixel_x_index,
-                                                                              end_pixel_y_index)
-        left, top = start_cartesian_position[0], start_cartesian_position[1]
-        right, bottom = end_cartesian_position[0], end_cartesian_position[1]
-        z_position = 0.01
-        polygon_positions = np.array([
-            [left, top, z_position],
-            [right, top, z_position],
-            [right, bottom, z_position],
-            [left, bottom, z_position],
-        ])
+        polygon_positions = self.pixel_indexes_to_quad_cartesian_positions(
+            np.array(pixel_x_index + 0.5), np.array(pixel_y_index + 0.5), size_in_pixels=self.kernel_size,
+            z_position=0.01)
         if isometric:
-            polygon_positions = self.from_cartesian_position_to_isometric_position(polygon_positions)
-        polygon = Polygon(*polygon_positions, color=RED, fill_color=RED, fill_opacity=0.5, stroke_opacity=0.0)
+            polygon_positions = self.from_cartesian_positions_to_isometric_positions(polygon_positions)
+        return self.create_neuron_kernel(polygon_positions)
+
+    @staticmethod
+    def create_neuron_kernel(vertexes: np.ndarray) -> Polygon:
+        polygon = Polygon(*vertexes, color=RED, fill_color=RED, fill_opacity=0.5, stroke_opacity=0.0)
         return polygon
 
     def create_neuron_output_centered_on_pixel_index(self, pixel_x_index: float, pixel_y_index: float,
                                                      isometric: bool = True) -> Polygon:
         output_size = 1
-        center_pixel_x_index = pixel_x_index + 0.5
-        center_pixel_y_index = pixel_y_index + 0.5
-        start_pixel_x_index = center_pixel_x_index - (output_size / 2)
-        start_pixel_y_index = center_pixel_y_index - (output_size / 2)
-        end_pixel_x_index = center_pixel_x_index + (output_size / 2)
-        end_pixel_y_index = center_pixel_y_index + (output_size / 2)
-        start_cartesian_position = self.pixel_index_to_pixel_start_cartesian_xy(start_pixel_x_index,
-                                                                                start_pixel_y_index)
-        end_cartesian_position = self.pixel_index_to_pixel_start_cartesian_xy(end_pixel_x_index,
-                                                                              end_pixel_y_index)
-        left, top = start_cartesian_position[0], start_cartesian_position[1]
-        right, bottom = end_cartesian_position[0], end_cartesian_position[1]
-        z_position = 2.0
-        polygon_positions = np.array([
-            [left, top, z_position],
-            [right, top, z_position],
-            [right, bottom, z_position],
-            [left, bottom, z_position],
-        ])
+        polygon_positions = self.pixel_indexes_to_quad_cartesian_positions(
+            np.array(pixel_x_index + 0.5), np.array(pixel_y_index + 0.5), size_in_pixels=output_size,
+            z_position=2.0)
         if isometric:
-            polygon_positions = self.from_cartesian_position_to_isometric_position(polygon_positions)
-        polygon = Polygon(*polygon_positions, color=RED, fill_color=RED, fill_opacity=1.0, stroke_color=BLACK,
+            polygon_positions = self.from_cartesian_positions_to_isometric_positions(polygon_positions)
+        return self.create_neuron_output(polygon_positions)
+
+    @staticmethod
+    def create_neuron_output(vertexes: np.ndarray) -> Polygon:
+        polygon = Polygon(*vertexes, color=RED, fill_color=RED, fill_opacity=1.0, stroke_color=BLACK,
                           stroke_opacity=1.0)
         return polygon
 
 
-class NeuronGroup:
-    def __init__(self, scene: IsometricNeuronsLookingAtPixelsSubScene, pixel_x_index: float, pixel_y_index: float):
-        self.neuron: Circle = scene.create_neuron_above_pixel_position(pixel_x_index, pixel_y_index)
-        self.neuron_animation_created: bool = False
-        self.kernel: Polygon = scene.create_neuron_kernel_centered_on_pixel_index(pixel_x_index, pixel_y_index)
-        self.kernel_animation_created: bool = False
-        self.output: Polygon = scene.create_neuron_output_centered_on_pixel_index(pixel_x_index, pixel_y_index)
-        self.output_animation_created: bool = False
-        self.cartesian_output: Polygon = scene.create_neuron_output_centered_on_pixel_index(
-            pixel_x_index, pixel_y_index, isometric=False)
-        self.v_group = VGroup(self.neuron, self.kernel, self.output)
-
-    def create_neuron_animation(self) -> Animation:
-        self.neuron_animation_created = True
-        return FadeIn(self.neuron, shift=DOWN)
+class IsometricGridGeometry:
+    def __init__(self, scene: IsometricNeuronsLookingAtPixelsSubScene):
+        pixel_y_indexes, pixel_x_indexes = np.meshgrid(np.arange(scene.number_of_pixels),
+                                                       np.arange(scene.number_of_pixels), indexing='ij')
+        pixel_center_x_indexes = pixel_x_indexes + 0.5
+        pixel_center_y_indexes = pixel_y_indexes + 0.5
+        self.cartesian_pixel_positions: np.ndarray = scene.pixel_indexes_to_quad_cartesian_positions(
+            pixel_center_x_indexes, pixel_center_y_indexes, size_in_pixels=1, z_position=0)
+        self.isometric_pixel_positions: np.ndarray = scene.from_cartesian_positions_to_isometric_positions(
+            self.cartesian_pixel_positions)
+        # Neurons are only placed where the full kernel fits within the padded image.
+        neuron_y_indexes, neuron_x_indexes = np.meshgrid(np.arange(scene.neuron_grid_size()),
+                                                         np.arange(scene.neuron_grid_size()), indexing='ij')
+        neuron_center_x_indexes = scene.neuron_index_to_kernel_center_pixel_index(neuron_x_indexes) + 0.5
+        neuron_center_y_indexes = scene.neuron_index_to_kernel_center_pixel_index(neuron_y_indexes) + 0.5
+        neuron_cartesian_x_positions, neuron_cartesian_y_positions = scene.pixel_index_to_pixel_start_cartesian_xy(
+            neuron_center_x_indexes, neuron_center_y_indexes)
+        neuron_cartesian_positions = np.stack([neuron_cartesian_x_positions, neuron_cartesian_y_positions,
+                                               np.ones_like(neuron_cartesian_x_positions)], axis=-1)
+        self.neuron_positions: np.ndarray = scene.from_cartesian_positions_to_isometric_positions(
+            neuron_cartesian_positions)
+        self.neuron_positions[..., 2] = 1  # Z position for occlusions.
+        self.kernel_positions: np.ndarray = scene.from_cartesian_positions_to_isometric_positions(
+            scene.pixel_indexes_to_quad_cartesian_positions(neuron_center_x_indexes, neuron_center_y_indexes,
+                                                            size_in_pixels=scene.kernel_size, z_position=0.01))
+        self.cartesian_output_positions: np.ndarray = scene.pixel_indexes_to_quad_cartesian_positions(
+            neuron_center_x_indexes, neuron_center_y_indexes, size_in_pixels=1, z_position=2.0)
+        self.output_positions: np.ndarray = scene.from_cartesian_positions_to_isometric_positions(
+            self.cartesian_output_positions)
+
+
+class NeuronGroupGrid:
+    def __init__(self, scene: IsometricNeuronsLookingAtPixelsSubScene, grid_geometry: IsometricGridGeometry):
+        # Neuron groups are only built the first time they are accessed, so large grids never hold the groups that
+        # are not shown.
+        self.scene: IsometricNeuronsLookingAtPixelsSubScene = scene
+        self.grid_geometry: IsometricGridGeometry = grid_geometry
+        self.neuron_groups: Dict[Tuple[int, int], NeuronGroup] = {}
+        self.rows: List[NeuronGroupGridRow] = [NeuronGroupGridRow(self, neuron_y_index)
+                                               for neuron_y_index in range(grid_geometry.neuron_positions.shape[0])]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, neuron_y_index: int) -> NeuronGroupGridRow:
+        return self.rows[neuron_y_index]
+
+    def __iter__(self) -> Iterator[NeuronGroupGridRow]:
+        return iter(self.rows)
+
+    def get_neuron_group(self, neuron_y_index: int, neuron_x_index: int) -> NeuronGroup:
+        neuron_group = self.neuron_groups.get((neuron_y_index, neuron_x_index))
+        if neuron_group is None:
+            neuron_group = NeuronGroup(
+                self.scene,
+                neuron_position=self.grid_geometry.neuron_positions[neuron_y_index, neuron_x_index],
+                kernel_positions=self.grid_geometry.kernel_positions[neuron_y_index, neuron_x_index],
+                output_positions=self.grid_geometry.output_positions[neuron_y_index, neuron_x_index],
+                cartesian_output_positions=self.grid_geometry.cartesian_output_positions[neuron_y_index,
+                                                                                         neuron_x_index])
+            self.neuron_groups[(neuron_y_index, neuron_x_index)] = neuron_group
+            self.scene.v_group.add(neuron_group.v_group)
+            self.scene.neuron_groups_v_group.add(neuron_group.v_group)
+        return neuron_group
+
+    def create_all_neuron_groups(self) -> List[NeuronGroup]:
+        return [neuron_group for row in self.rows for neuron_group in row]
+
+
+class NeuronGroupGridRow:
+    def __init__(self, neuron_group_grid: NeuronGroupGrid, neuron_y_index: int):
+        self.neuron_group_grid: NeuronGroupGrid = neuron_group_grid
+        self.neuron_y_index: int = neuron_y_index
+
+    def __len__(self) -> int:
+        return self.neuron_group_grid.grid_geometry.neuron_positions.shape[1]
+
+    def __getitem__(self, neuron_x_index: int) -> NeuronGroup:
+        neuron_x_index = range(len(self))[neuron_x_index]  # Normalizes negative indexes and bounds checks.
+        return self.neuron_group_grid.get_neuron_group(self.neuron_y_index, neuron_x_index)
+
+    def __iter__(self) -> Iterator[NeuronGroup]:
+        return (self[neuron_x_index] for neuron_x_index in range(len(self)))
 
-    def create_kernel_animation(self) -> Animation:
-        self.kernel_animation_created = True
-        return FadeIn(self.kernel, shift=DOWN)
 
-    def create_output_animation(self) -> Animation:
-        self.output_animation_created = True
-        return FadeIn(self.output, shift=UP)
+class NeuronGroup:
+    def __init__(self, scene: IsometricNeuronsLookingAtPixelsSubScene, neuron_position: np.ndarray,
+                 kernel_positions: np.ndarray, output_positions: np.ndarray, cartesian_output_positions: np.ndarray):
+        self.neuron: Circle = scene.create_neuron(position=neuron_position)
+        self.kernel: Polygon = scene.create_neuron_kernel(kernel_positions)
+        self.output: Polygon = scene.create_neuron_output(output_positions)
+        self.cartesian_output: Polygon = scene.create_neuron_output(cartesian_output_positions)
+        self.v_group = VGroup(self.neuron, self.kernel, self.output)
@@ -0,0 +1,36 @@
+import numpy as np
+
+
+class IsometricProjection:
+    def __init__(self, theta: float, scale: float, y_base_shift: float, y_per_z_shift: float):
+        self.theta: float = theta
+        self.scale: float = scale
+        self.y_base_shift: float = y_base_shift
+        self.y_per_z_shift: float = y_per_z_shift
+        # Rotate the xy plane by -theta, squash the rotated y by scale, lift y with z and keep z for occlusion, as one
+        # affine map `matrix @ point + offset`.
+        cos_theta, sin_theta = np.cos(theta), np.sin(theta)
+        self.matrix: np.ndarray = np.array([[cos_theta, sin_theta, 0],
+                                            [-sin_theta * scale, cos_theta * scale, y_per_z_shift],
+                                            [0, 0, 1]])
+        self.offset: np.ndarray = np.array([0, y_base_shift, 0])
+        self.inverse_matrix: np.ndarray = np.linalg.inv(self.matrix)
+
+    def apply(self, cartesian_positions: np.ndarray) -> np.ndarray:
+        isometric_positions = np.array(cartesian_positions, dtype=np.float64)
+        self.apply_in_place(isometric_positions)
+        return isometric_positions
+
+    def apply_in_place(self, positions: np.ndarray) -> np.ndarray:
+        # Points are along the last axis, any leading shape works.
+        positions[...] = positions @ self.matrix.T + self.offset
+        return positions
+
+    def invert(self, isometric_positions: np.ndarray) -> np.ndarray:
+        cartesian_positions = np.array(isometric_positions, dtype=np.float64)
+        self.invert_in_place(cartesian_positions)
+        return cartesian_positions
+
+    def invert_in_place(self, positions: np.ndarray) -> np.ndarray:
+        positions[...] = (positions - self.offset) @ self.inverse_matrix.T
+        return positions
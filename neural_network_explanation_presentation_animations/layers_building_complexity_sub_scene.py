@@ -1,52 +1,77 @@
-from typing import List, Union, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from colour import Color
-from manim import Polygon, Line, Circle, BLACK, RED, VGroup, RIGHT, RoundedRectangle, LEFT, BLUE, DOWN, GRAY, WHITE, \
-    DARK_GRAY, LIGHT_GRAY, GREEN, YELLOW, UP, Arrow, rgba_to_color, Scene, ReplacementTransform, Create, FadeIn, \
-    FadeOut, DoubleArrow, Text
+from manim import Line, Circle, BLACK, RED, VGroup, RIGHT, RoundedRectangle, LEFT, BLUE, DOWN, GRAY, WHITE, \
+    DARK_GRAY, LIGHT_GRAY, GREEN, YELLOW, UP, Arrow, rgba_to_color, ReplacementTransform, Create, DoubleArrow, Text, \
+    VMobject, VectorizedPoint, Rectangle
 
+from neural_network_explanation_presentation_animations.configuration import is_proxy_render
+from neural_network_explanation_presentation_animations.level_of_detail import arc_component_count
+from neural_network_explanation_presentation_animations.pixel_grid import PixelGrid
+from neural_network_explanation_presentation_animations.timeline import TimelineSection, TimelineResources, Enter, \
+    Exit, Remove
 
-def create_faded_text(neuron_text):
-    return Text(neuron_text, fill_color=BLACK, fill_opacity=0.3, font_size=24, font='JetBrainsMono-Regular.ttf')
+
+@lru_cache(maxsize=256)
+def create_shaped_text(text: str, font: str, font_size: float, fill_opacity: float) -> Text:
+    return Text(text, fill_color=BLACK, fill_opacity=fill_opacity, font_size=font_size, font=font)
+
+
+def create_faded_text(neuron_text: str) -> VMobject:
+    if neuron_text == '':
+        return VectorizedPoint()
+    if is_proxy_render():
+        # Skips text shaping. Labels are only centred on neurons and pixels, so a block that fits within them leaves
+        # the layout unchanged.
+        return Rectangle(width=0.12 * len(neuron_text), height=0.18, stroke_width=0, fill_color=BLACK,
+                         fill_opacity=0.3)
+    # Shaping is only done once per distinct label, each caller gets its own copy to position.
+    return create_shaped_text(neuron_text, font='JetBrainsMono-Regular.ttf', font_size=24, fill_opacity=0.3).copy()
+
+
+def pixel_grid_square_cell_corner_positions(number_of_pixels: int, grid_size: float) -> np.ndarray:
+    pixel_size = grid_size / number_of_pixels
+    pixel_y_indexes, pixel_x_indexes = np.indices((number_of_pixels, number_of_pixels))
+    # Corners run clockwise from the top left, the same order the per cell polygons used.
+    corner_x_indexes = pixel_x_indexes[..., np.newaxis] + np.array([0, 1, 1, 0])
+    corner_y_indexes = pixel_y_indexes[..., np.newaxis] + np.array([0, 0, 1, 1])
+    return np.stack([(-grid_size / 2) + (corner_x_indexes * pixel_size),
+                     (grid_size / 2) - (corner_y_indexes * pixel_size),
+                     np.zeros(corner_x_indexes.shape)], axis=-1)
+
+
+@lru_cache(maxsize=32)
+def create_pixel_grid_square_template(number_of_pixels: int, grid_size: float) -> PixelGrid:
+    return PixelGrid(pixel_grid_square_cell_corner_positions(number_of_pixels, grid_size), stroke_color=BLACK)
 
 
 class PixelGridSquare:
-    def __init__(self, number_of_pixels: int, color_array: np.ndarray, text_array: Optional[np.ndarray] = None):
+    def __init__(self, number_of_pixels: int, color_array: np.ndarray, text_array: Optional[np.ndarray] = None,
+                 grid_size: float = 3 * 0.4):
         if text_array is None:
             text_array = np.full(shape=[number_of_pixels, number_of_pixels], fill_value='')
-        self.grid_size: float = 3 * 0.4
+        self.grid_size: float = grid_size
         self.number_of_pixels = number_of_pixels
         self.pixel_size = self.grid_size / self.number_of_pixels
         assert color_array.shape == (number_of_pixels, number_of_pixels)
-        self.v_group: VGroup = VGroup()
-        polygon_list_list: List[List[Polygon]] = []
-        text_list_list: List[List[Text]] = []
-        for pixel_y_index in range(number_of_pixels):
-            polygon_list: List[Polygon] = []
-            text_list: List[Text] = []
-            for pixel_x_index in range(number_of_pixels):
-                left, top = self.pixel_index_to_pixel_start_cartesian_xy(pixel_x_index, pixel_y_index)
-                right = left + self.pixel_size
-                bottom = top - self.pixel_size
-                polygon_vertexes = [
-                    [left, top, 0],
-                    [right, top, 0],
-                    [right, bottom, 0],
-                    [left, bottom, 0],
-                ]
-                polygon = Polygon(*polygon_vertexes, stroke_color=BLACK,
-                                  fill_color=color_array[pixel_y_index, pixel_x_index], fill_opacity=1.0)
-                polygon_list.append(polygon)
-                self.v_group.add(polygon)
-                text = create_faded_text(str(text_array[pixel_y_index, pixel_x_index]))
-                text.move_to(polygon.get_center())
-                text_list.append(text)
-                self.v_group.add(text)
-            text_list_list.append(text_list)
-            polygon_list_list.append(polygon_list)
-        self.polygon_array: np.ndarray = np.array(polygon_list_list).squeeze()
-        self.text_array: np.ndarray = np.array(text_list_list).squeeze()
+        assert text_array.shape == (number_of_pixels, number_of_pixels)
+        # The geometry is built once per shape, every grid of that shape copies it and only sets its own fills.
+        self.pixel_grid: PixelGrid = create_pixel_grid_square_template(number_of_pixels, grid_size).copy()
+        self.set_colors(color_array)
+        self.v_group: VGroup = VGroup(self.pixel_grid)
+        # Only labelled cells get a text mobject, keyed by (pixel_y_index, pixel_x_index).
+        self.texts: Dict[Tuple[int, int], VMobject] = {}
+        for pixel_y_index, pixel_x_index in zip(*np.nonzero(text_array.astype(str) != '')):
+            text = create_faded_text(str(text_array[pixel_y_index, pixel_x_index]))
+            text.move_to(self.pixel_grid.get_cell_center(pixel_x_index, pixel_y_index))
+            self.texts[(int(pixel_y_index), int(pixel_x_index))] = text
+            self.v_group.add(text)
+
+    def set_colors(self, color_array: np.ndarray) -> 'PixelGridSquare':
+        self.pixel_grid.set_cell_fills(color_array, np.ones(color_array.shape))
+        return self
 
     def pixel_index_to_pixel_start_cartesian_xy(self, pixel_x_index: float, pixel_y_index: float) -> (float, float):
         cartesian_x_position = (-self.grid_size / 2) + (pixel_x_index * self.pixel_size)
@@ -68,8 +93,8 @@ class NeuronWithKernel:
                                        np.array([-neuron_to_grid_distance, -self.kernel.grid_size / 2, -1]))
         )
         self.neuron: Circle = Circle(radius=self.neuron_radius, stroke_color=BLACK, fill_color=neuron_color,
-                                     fill_opacity=1.0)
-        self.neuron_text: Text = create_faded_text(neuron_text)
+                                     fill_opacity=1.0, num_components=arc_component_count())
+        self.neuron_text: VMobject = create_faded_text(neuron_text)
         neuron_plus_indicator_lines_v_group: VGroup = VGroup(self.neuron, self.indicator_lines)
         neuron_plus_indicator_lines_v_group.next_to(self.kernel.v_group, direction=RIGHT, buff=0)
         self.neuron_text.move_to(self.neuron.get_center())
@@ -186,43 +211,43 @@ class LayerBuildingComplexitySubScene:
             fill_color=BLACK)
         self.v_group.add(self.corner_representation_arrow)
 
-    def create_later_sections(self, scene: Scene):
-        scene.next_section()
-        scene.play(FadeIn(self.light_to_dark_gradient_neuron.v_group, self.dark_to_light_gradient_neuron.neuron_text))
-
-        scene.next_section()
-        scene.play(FadeIn(self.line_layer))
-
-        scene.next_section()
-        scene.play(FadeIn(self.vertical_line_neuron.v_group))
-
-        scene.next_section()
-        scene.play(FadeIn(self.vertical_line_in_original_image_pixel_grid.v_group,
-                          self.vertical_line_representation_arrow))
-
-        scene.next_section()
-        scene.play(FadeOut(self.vertical_line_in_original_image_pixel_grid.v_group,
-                           self.vertical_line_representation_arrow))
-
-        scene.next_section()
-        scene.play(FadeIn(self.vertical_line_in_original_image_pixel_grid.v_group,
-                          self.vertical_line_representation_arrow))
-
-        scene.next_section()
-        scene.play(FadeIn(self.horizontal_line_neuron.v_group))
-
-        scene.next_section()
-        scene.play(FadeIn(self.line_layer_to_corner_layer_arrow, self.corner_layer))
-
-        scene.next_section()
-        scene.play(FadeIn(self.corner_neuron_kernel.v_group))
-
-        scene.next_section()
-        scene.play(FadeIn(self.corner_in_original_image_pixel_grid.v_group, self.corner_representation_arrow))
-
-        scene.next_section()
-        scene.remove(self.dark_to_light_gradient_neuron.v_group)  # Hacky remove all.
-        scene.wait(1)
+    @staticmethod
+    def create_later_timeline_sections(resource_name: str = 'layers_building_complexity_sub_scene'
+                                       ) -> List[TimelineSection]:
+        # Steps look the sub-scene up through the timeline's resources rather than holding on to it, so it can be
+        # released after its last section.
+        def sub_scene(resources: TimelineResources) -> LayerBuildingComplexitySubScene:
+            return resources[resource_name]
+        uses = [resource_name]
+        return [
+            TimelineSection('second_gradient_neuron', uses, lambda resources: [
+                Enter(sub_scene(resources).light_to_dark_gradient_neuron.v_group,
+                      sub_scene(resources).dark_to_light_gradient_neuron.neuron_text)]),
+            TimelineSection('line_layer', uses, lambda resources: [Enter(sub_scene(resources).line_layer)]),
+            TimelineSection('vertical_line_neuron', uses, lambda resources: [
+                Enter(sub_scene(resources).vertical_line_neuron.v_group)]),
+            TimelineSection('vertical_line_in_image', uses, lambda resources: [
+                Enter(sub_scene(resources).vertical_line_in_original_image_pixel_grid.v_group,
+                      sub_scene(resources).vertical_line_representation_arrow)]),
+            TimelineSection('hide_vertical_line_in_image', uses, lambda resources: [
+                Exit(sub_scene(resources).vertical_line_in_original_image_pixel_grid.v_group,
+                     sub_scene(resources).vertical_line_representation_arrow)]),
+            TimelineSection('show_vertical_line_in_image', uses, lambda resources: [
+                Enter(sub_scene(resources).vertical_line_in_original_image_pixel_grid.v_group,
+                      sub_scene(resources).vertical_line_representation_arrow)]),
+            TimelineSection('horizontal_line_neuron', uses, lambda resources: [
+                Enter(sub_scene(resources).horizontal_line_neuron.v_group)]),
+            TimelineSection('corner_layer', uses, lambda resources: [
+                Enter(sub_scene(resources).line_layer_to_corner_layer_arrow, sub_scene(resources).corner_layer)]),
+            TimelineSection('corner_neuron_kernel', uses, lambda resources: [
+                Enter(sub_scene(resources).corner_neuron_kernel.v_group)]),
+            TimelineSection('corner_in_image', uses, lambda resources: [
+                Enter(sub_scene(resources).corner_in_original_image_pixel_grid.v_group,
+                      sub_scene(resources).corner_representation_arrow)]),
+            TimelineSection('clear_layers', uses, lambda resources: [
+                Remove(sub_scene(resources).dark_to_light_gradient_neuron.v_group)],  # Hacky remove all.
+                wait_seconds=1),
+        ]
 
     def create_layers(self) -> (RoundedRectangle, RoundedRectangle, RoundedRectangle):
         gradient_layer = self.create_layer_rectangle()
@@ -0,0 +1,44 @@
+import math
+from typing import Callable, Dict, Hashable
+
+import numpy as np
+from manim import Mobject, config
+
+from neural_network_explanation_presentation_animations.configuration import is_proxy_render
+
+quality_pixels_per_segment: Dict[str, float] = {
+    'low_quality': 24,
+    'medium_quality': 16,
+    'high_quality': 12,
+    'production_quality': 8,
+    'fourk_quality': 8,
+}
+proxy_pixels_per_segment: float = 48
+
+
+def mesh_resolution(on_screen_scene_size: float, minimum_resolution: int = 3, maximum_resolution: int = 32) -> int:
+    # A mesh needs roughly one segment per `pixels_per_segment` pixels it covers on screen, finer for better presets.
+    pixels_per_segment = quality_pixels_per_segment.get(config.quality, 12)
+    if is_proxy_render():
+        pixels_per_segment = proxy_pixels_per_segment
+    on_screen_pixel_size = on_screen_scene_size / config.frame_width * config.pixel_width
+    resolution = math.ceil(on_screen_pixel_size / pixels_per_segment)
+    return int(np.clip(resolution, minimum_resolution, maximum_resolution))
+
+
+def arc_component_count() -> int:
+    # Quarter circle components keep a circle's extremes, and so its bounding box, while drawing fewer curves.
+    return 5 if is_proxy_render() else 9
+
+
+class MeshTemplateCache:
+    def __init__(self):
+        self.templates: Dict[Hashable, Mobject] = {}
+
+    def create(self, key: Hashable, create_template: Callable[[], Mobject], shift: np.ndarray) -> Mobject:
+        # Parametric surfaces are evaluated once per distinct shape, every further instance is a translated copy.
+        template = self.templates.get(key)
+        if template is None:
+            template = create_template()
+            self.templates[key] = template
+        return template.copy().shift(shift)
@@ -1,140 +1,161 @@
 from pathlib import Path
+from typing import List, Optional
 
-import numpy as np
-from manim import Scene, LaggedStart, ReplacementTransform, FadeIn, IN, FadeOut, VGroup, ImageMobject, RIGHT, Mobject, \
-    ApplyFunction, MoveToTarget, DOWN
+from manim import IN, VGroup, RIGHT, Mobject, ApplyFunction, DOWN, UP
+from manim.utils.family import extract_mobject_family_members
 
 from neural_network_explanation_presentation_animations.configuration import set_up_configuration
+from neural_network_explanation_presentation_animations.image_assets import image_asset_registry
 from neural_network_explanation_presentation_animations.isometric_neurons_looking_at_pixels_sub_scene import \
     IsometricNeuronsLookingAtPixelsSubScene
 from neural_network_explanation_presentation_animations.layers_building_complexity_sub_scene import \
     LayerBuildingComplexitySubScene
-from neural_network_explanation_presentation_animations.mobject_set_operations import mobjects_from_v_group
-
-
-class MainScene(Scene):
-    def __init__(self):
-        super().__init__()
-        self.isometric_neurons_looking_at_pixels_sub_scene: IsometricNeuronsLookingAtPixelsSubScene = \
-            IsometricNeuronsLookingAtPixelsSubScene()
-        self.layers_building_complexity_sub_scene: LayerBuildingComplexitySubScene = LayerBuildingComplexitySubScene()
-        self.skip_animations = False
+from neural_network_explanation_presentation_animations.mobject_set_operations import flatten_v_group, \
+    mobject_intersection, mobject_subtraction
+from neural_network_explanation_presentation_animations.section_snapshots import SectionSnapshotStore
+from neural_network_explanation_presentation_animations.sectioned_scene import SectionedScene, SectionSelection
+from neural_network_explanation_presentation_animations.sub_scene_cache import SubSceneCache
+from neural_network_explanation_presentation_animations.timeline import Timeline, TimelineSection, \
+    TimelineResources, TimelineStep, Add, Enter, Exit, Transform, BatchedTransform, Play
+
+isometric_resource_name = 'isometric_neurons_looking_at_pixels_sub_scene'
+layers_resource_name = 'layers_building_complexity_sub_scene'
+
+
+def shift_and_scale(mobject: Mobject) -> Mobject:
+    mobject.scale(0.8)
+    mobject.shift(RIGHT * 2)
+    return mobject
+
+
+class MainScene(SectionedScene):
+    def __init__(self, sub_scene_cache: Optional[SubSceneCache] = None,
+                 section_selection: Optional[SectionSelection] = None,
+                 section_snapshot_store: Optional[SectionSnapshotStore] = None, **kwargs):
+        super().__init__(section_selection=section_selection, **kwargs)
+        if sub_scene_cache is None:
+            sub_scene_cache = SubSceneCache()
+        self.sub_scene_cache: SubSceneCache = sub_scene_cache
+        self.section_snapshot_store: Optional[SectionSnapshotStore] = section_snapshot_store
+
+    def create_timeline(self) -> Timeline:
+        sub_scene_cache = self.sub_scene_cache
+        resource_factories = {
+            'background': create_background,
+            isometric_resource_name: lambda: sub_scene_cache.load_or_create(IsometricNeuronsLookingAtPixelsSubScene),
+            layers_resource_name: lambda: sub_scene_cache.load_or_create(LayerBuildingComplexitySubScene),
+        }
+        return Timeline(resource_factories, [
+            *create_isometric_timeline_sections(),
+            *LayerBuildingComplexitySubScene.create_later_timeline_sections(layers_resource_name),
+            TimelineSection('end', wait_seconds=1),
+        ])
 
     def construct(self):
-        background_mobject = ImageMobject(
-            Path('neural_network_explanation_presentation_animations/images/background.jpg'))
-        background_mobject.scale_to_fit_height(8)
-        background_mobject.z_index = -1_000_000
-        self.add(background_mobject)
-        self.next_section(skip_animations=self.skip_animations)
-        self.add(self.isometric_neurons_looking_at_pixels_sub_scene.planetary_nebula_image_mobject)
-        self.wait(1)
-
-        self.next_section(skip_animations=self.skip_animations)
-        self.play(FadeOut(self.isometric_neurons_looking_at_pixels_sub_scene.planetary_nebula_image_mobject),
-                  FadeIn(*self.isometric_neurons_looking_at_pixels_sub_scene.cartesian_pixel_grid))
-
-        self.next_section(skip_animations=self.skip_animations)
-
-        self.play(FadeIn(self.isometric_neurons_looking_at_pixels_sub_scene.cartesian_neuron, shift=IN))
-
-        self.next_section(skip_animations=self.skip_animations)
-        self.play(FadeIn(self.isometric_neurons_looking_at_pixels_sub_scene.cartesian_neuron_kernel, shift=IN))
-
-        self.next_section(skip_animations=self.skip_animations)
-        coordinate_swap_animations = []
-        for flat_grid_index in range(len(self.isometric_neurons_looking_at_pixels_sub_scene.cartesian_pixel_grid)):
-            coordinate_swap_animations.append(ReplacementTransform(
-                self.isometric_neurons_looking_at_pixels_sub_scene.cartesian_pixel_grid[flat_grid_index],
-                self.isometric_neurons_looking_at_pixels_sub_scene.isometric_pixel_grid[flat_grid_index]))
-        isometric_neuron = self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[0][0].neuron
-        self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[0][0].neuron_animation_created = True
-        coordinate_swap_animations.append(
-            ReplacementTransform(self.isometric_neurons_looking_at_pixels_sub_scene.cartesian_neuron, isometric_neuron))
-        isometric_neuron_kernel = self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[0][0].kernel
-        self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[0][0].kernel_animation_created = True
-        coordinate_swap_animations.append(
-            ReplacementTransform(self.isometric_neurons_looking_at_pixels_sub_scene.cartesian_neuron_kernel,
-                                 isometric_neuron_kernel))
-        self.play(*coordinate_swap_animations)
-
-        self.next_section()
-        isometric_neuron_copy = isometric_neuron.copy()
-        isometric_neuron_kernel_copy = isometric_neuron_kernel.copy()
-        self.add(isometric_neuron_copy, isometric_neuron_kernel_copy)
-        def shift_and_scale(mobject: Mobject) -> Mobject:
-            mobject.scale(0.8)
-            mobject.shift(RIGHT * 2)
-            return mobject
-
-        # self.play(FadeOut(*in_scene_isometric_sub_scene_mobjects))
-
-        in_scene_isometric_sub_scene_mobjects = list(
-            set(mobjects_from_v_group(self.isometric_neurons_looking_at_pixels_sub_scene.v_group)) & set(self.mobjects))
-        in_scene_isometric_sub_scene_v_group = VGroup(*in_scene_isometric_sub_scene_mobjects)
-        out_scene_isometric_sub_scene_mobjects = list(
-            set(mobjects_from_v_group(self.isometric_neurons_looking_at_pixels_sub_scene.v_group)) - set(self.mobjects))
-        out_scene_isometric_sub_scene_v_group = VGroup(*out_scene_isometric_sub_scene_mobjects)
+        self.create_timeline().run(self, snapshot_store=self.section_snapshot_store)
+
+
+def create_background() -> Mobject:
+    background_mobject = image_asset_registry.create_image_mobject(
+        Path('neural_network_explanation_presentation_animations/images/background.jpg'), height=8)
+    background_mobject.z_index = -1_000_000
+    return background_mobject
+
+
+def create_isometric_timeline_sections() -> List[TimelineSection]:
+    def isometric(resources: TimelineResources) -> IsometricNeuronsLookingAtPixelsSubScene:
+        return resources[isometric_resource_name]
+
+    def layers(resources: TimelineResources) -> LayerBuildingComplexitySubScene:
+        return resources[layers_resource_name]
+
+    def create_coordinate_swap_steps(resources: TimelineResources) -> List[TimelineStep]:
+        first_neuron_group = isometric(resources).neuron_groups[0][0]
+        # One morph over shared buffers, rather than a deep copied start and target per pair.
+        return [BatchedTransform(
+            [isometric(resources).cartesian_pixel_grid, isometric(resources).cartesian_neuron,
+             isometric(resources).cartesian_neuron_kernel],
+            [isometric(resources).isometric_pixel_grid, first_neuron_group.neuron, first_neuron_group.kernel])]
+
+    def create_isometric_neuron_copy_steps(resources: TimelineResources) -> List[TimelineStep]:
+        first_neuron_group = isometric(resources).neuron_groups[0][0]
+        isometric_neuron_copy = first_neuron_group.neuron.copy()
+        isometric_neuron_kernel_copy = first_neuron_group.kernel.copy()
+        resources.produce('isometric_neuron_copy', isometric_neuron_copy)
+        resources.produce('isometric_neuron_kernel_copy', isometric_neuron_kernel_copy)
+        # Every neuron group is shown later on, so all are built now for the move below to place them with the rest.
+        isometric(resources).neuron_groups.create_all_neuron_groups()
+        return [Add(isometric_neuron_copy, isometric_neuron_kernel_copy)]
+
+    def create_move_isometric_scene_aside_steps(resources: TimelineResources) -> List[TimelineStep]:
+        isometric_sub_scene_mobjects = flatten_v_group(isometric(resources).v_group)
+        in_scene_mobjects = extract_mobject_family_members(resources.scene.mobjects)
+        in_scene_isometric_sub_scene_v_group = VGroup(*mobject_intersection(isometric_sub_scene_mobjects,
+                                                                            in_scene_mobjects))
+        out_scene_isometric_sub_scene_v_group = VGroup(*mobject_subtraction(isometric_sub_scene_mobjects,
+                                                                            in_scene_mobjects))
         shift_and_scale(out_scene_isometric_sub_scene_v_group)
-
-        self.next_section()
-        self.play(
-            ApplyFunction(shift_and_scale, in_scene_isometric_sub_scene_v_group),
-            ReplacementTransform(
-                isometric_neuron_copy,
-                VGroup(
-                    self.layers_building_complexity_sub_scene.dark_to_light_gradient_neuron.neuron,
-                    self.layers_building_complexity_sub_scene.dark_to_light_gradient_neuron.indicator_lines
-                )
-            ),
-            ReplacementTransform(
-                isometric_neuron_kernel_copy,
-                self.layers_building_complexity_sub_scene.dark_to_light_gradient_neuron.kernel.v_group
-            )
-        )
-        out_scene_isometric_sub_scene_v_group.align_to(in_scene_isometric_sub_scene_v_group, direction=DOWN)
-
-        self.next_section()
-        self.play(self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[0][0].create_output_animation())
-
-        self.next_section()
-        self.play(self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[0][1].create_neuron_animation(),
-                  self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[0][1].create_kernel_animation())
-
-        self.next_section(skip_animations=self.skip_animations)
-        section_animations = []
-        for y_index in range(len(self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups)):
-            for x_index in range(len(self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[y_index])):
-                neuron_group = self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[y_index][x_index]
-                if not neuron_group.neuron_animation_created:
-                    section_animations.append(neuron_group.create_neuron_animation())
-                if not neuron_group.kernel_animation_created:
-                    section_animations.append(neuron_group.create_kernel_animation())
-        self.play(LaggedStart(*section_animations, lag_ratio=0.01))
-
-        self.next_section()
-        self.play(FadeIn(self.layers_building_complexity_sub_scene.gradient_layer))
-
-        self.next_section()
-        self.play(FadeIn(self.layers_building_complexity_sub_scene.gradient_layer_to_line_layer_arrow))
-
-        self.next_section(skip_animations=self.skip_animations)
-        section_animations = []
-        for y_index in range(len(self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups)):
-            for x_index in range(len(self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[y_index])):
-                neuron_group = self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups[y_index][x_index]
-                if not neuron_group.output_animation_created:
-                    section_animations.append(neuron_group.create_output_animation())
-        self.play(LaggedStart(*section_animations, lag_ratio=0.01))
-
-        self.next_section(skip_animations=self.skip_animations)
-        self.play(FadeOut(self.isometric_neurons_looking_at_pixels_sub_scene.isometric_pixel_grid_v_group,
-                          self.isometric_neurons_looking_at_pixels_sub_scene.neuron_groups_v_group))
-
-        self.layers_building_complexity_sub_scene.create_later_sections(scene=self)
-
-        self.next_section(skip_animations=self.skip_animations)
-        self.wait(1)
+        resources.produce('in_scene_isometric_sub_scene_v_group', in_scene_isometric_sub_scene_v_group)
+        resources.produce('out_scene_isometric_sub_scene_v_group', out_scene_isometric_sub_scene_v_group)
+        dark_to_light_gradient_neuron = layers(resources).dark_to_light_gradient_neuron
+        return [
+            Play(ApplyFunction(shift_and_scale, in_scene_isometric_sub_scene_v_group)),
+            Transform(resources.consume('isometric_neuron_copy'),
+                      VGroup(dark_to_light_gradient_neuron.neuron, dark_to_light_gradient_neuron.indicator_lines)),
+            Transform(resources.consume('isometric_neuron_kernel_copy'),
+                      dark_to_light_gradient_neuron.kernel.v_group),
+        ]
+
+    def create_first_neuron_output_steps(resources: TimelineResources) -> List[TimelineStep]:
+        # The parts of the sub-scene that were not shown yet follow the shown parts to their final place.
+        resources.consume('out_scene_isometric_sub_scene_v_group').align_to(
+            resources.consume('in_scene_isometric_sub_scene_v_group'), direction=DOWN)
+        return [Enter(isometric(resources).neuron_groups[0][0].output, shift=UP)]
+
+    def create_remaining_neurons_steps(resources: TimelineResources) -> List[TimelineStep]:
+        neurons_and_kernels = [mobject for neuron_group_row in isometric(resources).neuron_groups
+                               for neuron_group in neuron_group_row
+                               for mobject in (neuron_group.neuron, neuron_group.kernel)]
+        return [Enter(*neurons_and_kernels, shift=DOWN, lag_ratio=0.01)]
+
+    def create_remaining_neuron_outputs_steps(resources: TimelineResources) -> List[TimelineStep]:
+        outputs = [neuron_group.output for neuron_group_row in isometric(resources).neuron_groups
+                   for neuron_group in neuron_group_row]
+        return [Enter(*outputs, shift=UP, lag_ratio=0.01)]
+
+    isometric_uses = [isometric_resource_name]
+    both_uses = [isometric_resource_name, layers_resource_name]
+    neuron_copy_value_names = ['isometric_neuron_copy', 'isometric_neuron_kernel_copy']
+    moved_v_group_value_names = ['in_scene_isometric_sub_scene_v_group', 'out_scene_isometric_sub_scene_v_group']
+    return [
+        TimelineSection('nebula_image', ['background', isometric_resource_name], lambda resources: [
+            Add(resources['background'], isometric(resources).planetary_nebula_image_mobject)], wait_seconds=1),
+        TimelineSection('image_to_pixel_grid', isometric_uses, lambda resources: [
+            Exit(isometric(resources).planetary_nebula_image_mobject),
+            Enter(isometric(resources).cartesian_pixel_grid)]),
+        TimelineSection('cartesian_neuron', isometric_uses, lambda resources: [
+            Enter(isometric(resources).cartesian_neuron, shift=IN)]),
+        TimelineSection('cartesian_neuron_kernel', isometric_uses, lambda resources: [
+            Enter(isometric(resources).cartesian_neuron_kernel, shift=IN)]),
+        TimelineSection('coordinate_swap', isometric_uses, create_coordinate_swap_steps),
+        TimelineSection('isometric_neuron_copy', isometric_uses, create_isometric_neuron_copy_steps,
+                        produces=neuron_copy_value_names),
+        TimelineSection('move_isometric_scene_aside', both_uses, create_move_isometric_scene_aside_steps,
+                        consumes=neuron_copy_value_names, produces=moved_v_group_value_names),
+        TimelineSection('first_neuron_output', isometric_uses, create_first_neuron_output_steps,
+                        consumes=moved_v_group_value_names),
+        TimelineSection('second_neuron', isometric_uses, lambda resources: [
+            Enter(isometric(resources).neuron_groups[0][1].neuron, isometric(resources).neuron_groups[0][1].kernel,
+                  shift=DOWN)]),
+        TimelineSection('remaining_neurons', isometric_uses, create_remaining_neurons_steps),
+        TimelineSection('gradient_layer', [layers_resource_name], lambda resources: [
+            Enter(layers(resources).gradient_layer)]),
+        TimelineSection('gradient_to_line_layer_arrow', [layers_resource_name], lambda resources: [
+            Enter(layers(resources).gradient_layer_to_line_layer_arrow)]),
+        TimelineSection('remaining_neuron_outputs', isometric_uses, create_remaining_neuron_outputs_steps),
+        TimelineSection('fade_out_isometric_scene', isometric_uses, lambda resources: [
+            Exit(isometric(resources).isometric_pixel_grid, isometric(resources).neuron_groups_v_group)]),
+    ]
 
 
 if __name__ == '__main__':
@@ -1,33 +1,89 @@
-from typing import List
+from typing import Iterable, List, Set, Tuple, Union
+from weakref import WeakKeyDictionary, ref
 
 from manim import VGroup, Mobject
 
 
-def mobjects_from_v_group(v_group: VGroup) -> List[Mobject]:
-    mobjects: List[Mobject] = []
-    for element in v_group.submobjects:
-        if isinstance(element, VGroup):
-            mobjects.extend(mobjects_from_v_group(element))
-        elif isinstance(element, Mobject):
-            mobjects.append(element)
-        else:
-            raise Exception(f'Unexpected element when looking for Mobjects: {element}')
-    return mobjects
+class FlattenedVGroup:
+    def __init__(self, v_group: VGroup):
+        self.mobjects: List[Mobject] = []
+        # Groups are only weakly referenced, as this is the value of a weak key cache entry for the outermost one. A
+        # strong reference would keep the key, and so the entry, alive forever.
+        self.group_snapshots: List[Tuple['ref[VGroup]', List[Mobject]]] = []
+        # Walk the tree with an explicit stack of iterators instead of recursing and rebuilding lists at every level.
+        self.group_snapshots.append((ref(v_group), list(v_group.submobjects)))
+        element_iterators = [iter(v_group.submobjects)]
+        while len(element_iterators) > 0:
+            element = next(element_iterators[-1], None)
+            if element is None:
+                element_iterators.pop()
+            elif isinstance(element, VGroup):
+                self.group_snapshots.append((ref(element), list(element.submobjects)))
+                element_iterators.append(iter(element.submobjects))
+            elif isinstance(element, Mobject):
+                self.mobjects.append(element)
+            else:
+                raise Exception(f'Unexpected element when looking for Mobjects: {element}')
+        self.mobjects = list(dict.fromkeys(self.mobjects))
+        self.mobject_set: Set[Mobject] = set(self.mobjects)
 
+    def is_current(self) -> bool:
+        for group_reference, snapshot in self.group_snapshots:
+            group = group_reference()
+            if group is None or group.submobjects != snapshot:
+                return False
+        return True
 
-def v_group_mobject_intersection(v_group0: VGroup, v_group1: VGroup) -> VGroup:
-    mobjects0: List[Mobject] = mobjects_from_v_group(v_group0)
-    mobjects1: List[Mobject] = mobjects_from_v_group(v_group1)
-    return VGroup(*list(set(mobjects0) & set(mobjects1)))
 
+flattened_v_group_cache: 'WeakKeyDictionary[VGroup, FlattenedVGroup]' = WeakKeyDictionary()
 
-def v_group_mobject_union(v_group0: VGroup, v_group1: VGroup) -> VGroup:
-    mobjects0: List[Mobject] = mobjects_from_v_group(v_group0)
-    mobjects1: List[Mobject] = mobjects_from_v_group(v_group1)
-    return VGroup(*list(set(mobjects0) | set(mobjects1)))
+MobjectCollection = Union[VGroup, FlattenedVGroup, Iterable[Mobject]]
 
 
-def v_group_mobject_subtraction(v_group0: VGroup, v_group1: VGroup) -> VGroup:
-    mobjects0: List[Mobject] = mobjects_from_v_group(v_group0)
-    mobjects1: List[Mobject] = mobjects_from_v_group(v_group1)
-    return VGroup(*list(set(mobjects0) - set(mobjects1)))
+def flatten_v_group(v_group: VGroup) -> FlattenedVGroup:
+    flattened_v_group = flattened_v_group_cache.get(v_group)
+    if flattened_v_group is None or not flattened_v_group.is_current():
+        flattened_v_group = FlattenedVGroup(v_group)
+        flattened_v_group_cache[v_group] = flattened_v_group
+    return flattened_v_group
+
+
+def mobjects_and_set_from_collection(mobjects: MobjectCollection) -> Tuple[List[Mobject], Set[Mobject]]:
+    if isinstance(mobjects, VGroup):
+        mobjects = flatten_v_group(mobjects)
+    if isinstance(mobjects, FlattenedVGroup):
+        return mobjects.mobjects, mobjects.mobject_set
+    mobject_list = list(mobjects)
+    return mobject_list, set(mobject_list)
+
+
+# The set operations keep the order of their first operand (then the second, for unions) so that z-ordering and
+# output are deterministic between renders.
+def mobject_intersection(mobjects0: MobjectCollection, mobjects1: MobjectCollection) -> List[Mobject]:
+    mobject_list0, _ = mobjects_and_set_from_collection(mobjects0)
+    _, mobject_set1 = mobjects_and_set_from_collection(mobjects1)
+    return [mobject for mobject in mobject_list0 if mobject in mobject_set1]
+
+
+def mobject_union(mobjects0: MobjectCollection, mobjects1: MobjectCollection) -> List[Mobject]:
+    mobject_list0, _ = mobjects_and_set_from_collection(mobjects0)
+    mobject_list1, _ = mobjects_and_set_from_collection(mobjects1)
+    return list(dict.fromkeys([*mobject_list0, *mobject_list1]))
+
+
+def mobject_subtraction(mobjects0: MobjectCollection, mobjects1: MobjectCollection) -> List[Mobject]:
+    mobject_list0, _ = mobjects_and_set_from_collection(mobjects0)
+    _, mobject_set1 = mobjects_and_set_from_collection(mobjects1)
+    return [mobject for mobject in mobject_list0 if mobject not in mobject_set1]
+
+
+def v_group_mobject_intersection(v_group0: MobjectCollection, v_group1: MobjectCollection) -> VGroup:
+    return VGroup(*mobject_intersection(v_group0, v_group1))
+
+
+def v_group_mobject_union(v_group0: MobjectCollection, v_group1: MobjectCollection) -> VGroup:
+    return VGroup(*mobject_union(v_group0, v_group1))
+
+
+def v_group_mobject_subtraction(v_group0: MobjectCollection, v_group1: MobjectCollection) -> VGroup:
+    return VGroup(*mobject_subtraction(v_group0, v_group1))
@@ -0,0 +1,82 @@
+from typing import List, Optional, Union
+
+import numpy as np
+from colour import Color
+from manim import VMobject, BLACK, WHITE, color_to_rgb
+
+
+def cell_corner_positions_to_points(cell_corner_positions: np.ndarray) -> np.ndarray:
+    # Each cell becomes its own closed subpath of four straight cubic bezier curves, laid out the same way
+    # `Polygon` lays out its corners.
+    start_positions = cell_corner_positions.reshape(-1, 4, 3)
+    end_positions = np.roll(start_positions, -1, axis=1)
+    difference = end_positions - start_positions
+    points = np.stack([start_positions, start_positions + (difference / 3), start_positions + (2 * difference / 3),
+                       end_positions], axis=2)
+    return points.reshape(-1, 3)
+
+
+class PixelGrid(VMobject):
+    def __init__(self, cell_corner_positions: np.ndarray, stroke_color: Union[Color, str] = BLACK,
+                 cell_fill_colors: Optional[np.ndarray] = None, cell_fill_opacities: Optional[np.ndarray] = None,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.number_of_rows: int = cell_corner_positions.shape[0]
+        self.number_of_columns: int = cell_corner_positions.shape[1]
+        if cell_fill_colors is None:
+            cell_fill_colors = np.full([self.number_of_rows, self.number_of_columns], fill_value=WHITE, dtype=object)
+        if cell_fill_opacities is None:
+            cell_fill_opacities = np.zeros([self.number_of_rows, self.number_of_columns])
+        self.cell_fill_colors: np.ndarray = np.array(cell_fill_colors, dtype=object)
+        self.cell_fill_opacities: np.ndarray = np.array(cell_fill_opacities, dtype=np.float64)
+        assert self.cell_fill_colors.shape == (self.number_of_rows, self.number_of_columns)
+        assert self.cell_fill_opacities.shape == (self.number_of_rows, self.number_of_columns)
+        self.outline: VMobject = VMobject(stroke_color=stroke_color, fill_opacity=0.0)
+        self.outline.set_points(cell_corner_positions_to_points(cell_corner_positions))
+        # One fill per cell with fixed geometry, recolouring only writes into their fill colours.
+        self.cell_fills: List[VMobject] = []
+        for cell_points in np.split(self.outline.points, self.number_of_rows * self.number_of_columns):
+            cell_fill = VMobject(stroke_width=0)
+            cell_fill.set_points(cell_points)
+            self.cell_fills.append(cell_fill)
+        self.fill_rgbas_buffer: np.ndarray = np.zeros((0, 4))
+        self.add(*self.cell_fills, self.outline)
+        self.update_cell_fill_rgbas()
+
+    def get_cell_corner_positions(self) -> np.ndarray:
+        outline_points = self.outline.points.reshape(self.number_of_rows, self.number_of_columns, 4, 4, 3)
+        return outline_points[:, :, :, 0]
+
+    def get_cell_center(self, cell_x_index: int, cell_y_index: int) -> np.ndarray:
+        return self.get_cell_corner_positions()[cell_y_index, cell_x_index].mean(axis=0)
+
+    def set_cell_fill(self, cell_x_index: int, cell_y_index: int, color: Union[Color, str],
+                      opacity: float = 1.0) -> 'PixelGrid':
+        self.cell_fill_colors[cell_y_index, cell_x_index] = color
+        self.cell_fill_opacities[cell_y_index, cell_x_index] = opacity
+        return self.update_cell_fill_rgbas()
+
+    def set_cell_fills(self, cell_fill_colors: np.ndarray, cell_fill_opacities: Optional[np.ndarray] = None
+                       ) -> 'PixelGrid':
+        self.cell_fill_colors[:] = cell_fill_colors
+        if cell_fill_opacities is not None:
+            self.cell_fill_opacities[:] = cell_fill_opacities
+        return self.update_cell_fill_rgbas()
+
+    def gather_fill_rgbas_buffer(self):
+        # Copies and many manim methods replace a mobject's arrays rather than mutating them, which detaches the cell
+        # fills from the buffer, so they are rebound to rows of a new one whenever that happened.
+        if all(cell_fill.fill_rgbas.base is self.fill_rgbas_buffer for cell_fill in self.cell_fills):
+            return
+        self.fill_rgbas_buffer = np.zeros((len(self.cell_fills), 4))
+        for cell_index, cell_fill in enumerate(self.cell_fills):
+            cell_fill.fill_rgbas = self.fill_rgbas_buffer[cell_index:cell_index + 1]
+
+    def update_cell_fill_rgbas(self) -> 'PixelGrid':
+        self.gather_fill_rgbas_buffer()
+        # Each distinct colour is converted once, every cell then takes its row in one assignment.
+        color_names, color_indexes = np.unique(self.cell_fill_colors.astype(str), return_inverse=True)
+        color_rgbs = np.array([color_to_rgb(color_name) for color_name in color_names]).reshape(-1, 3)
+        self.fill_rgbas_buffer[:, :3] = color_rgbs[color_indexes.reshape(-1)]
+        self.fill_rgbas_buffer[:, 3] = self.cell_fill_opacities.reshape(-1)
+        return self
@@ -0,0 +1,140 @@
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from manim import config
+from manim.utils.family import extract_mobject_family_members
+
+from neural_network_explanation_presentation_animations.sectioned_scene import SectionedScene
+
+section_timing_names = ('interpolation', 'rasterization', 'encoding')
+
+
+class SectionProfile:
+    def __init__(self, section_index: int, section_name: str):
+        self.section_index: int = section_index
+        self.section_name: str = section_name
+        self.skipped: bool = False
+        self.start_time: float = time.perf_counter()
+        self.wall_seconds: float = 0
+        self.timing_seconds: Dict[str, float] = {name: 0.0 for name in section_timing_names}
+        self.frame_count: int = 0
+        self.mobject_count: int = 0
+        self.point_count: int = 0
+
+    def finish(self, scene: SectionedScene):
+        self.wall_seconds = time.perf_counter() - self.start_time
+        family_members = extract_mobject_family_members(scene.mobjects)
+        self.mobject_count = len(family_members)
+        self.point_count = sum(len(mobject.points) for mobject in family_members)
+
+    def to_dictionary(self) -> Dict[str, Any]:
+        # Whatever is not spent interpolating, rasterizing or encoding is spent constructing mobjects and animations.
+        construction_seconds = self.wall_seconds - sum(self.timing_seconds.values())
+        return {
+            'section_index': self.section_index,
+            'section_name': self.section_name,
+            'skipped': self.skipped,
+            'wall_seconds': self.wall_seconds,
+            'construction_seconds': construction_seconds,
+            **{f'{name}_seconds': seconds for name, seconds in self.timing_seconds.items()},
+            'frame_count': self.frame_count,
+            'mobject_count': self.mobject_count,
+            'point_count': self.point_count,
+        }
+
+
+class RenderProfiler:
+    def __init__(self, scene: SectionedScene):
+        self.scene: SectionedScene = scene
+        self.section_profiles: List[SectionProfile] = [SectionProfile(-1, 'before_first_section')]
+        self.render_seconds: float = 0
+        # The hot methods are wrapped on the instances only, so nothing outside this render is affected.
+        self.wrap_method(scene, 'next_section', self.timed_next_section)
+        self.wrap_timed_method(scene, 'update_to_time', 'interpolation')
+        self.wrap_timed_method(scene.renderer, 'update_frame', 'rasterization')
+        self.wrap_timed_method(scene.renderer.file_writer, 'write_frame', 'encoding', counts_frames=True)
+        self.wrap_timed_method(scene.renderer.file_writer, 'end_animation', 'encoding')
+
+    @staticmethod
+    def wrap_method(instance: Any, method_name: str, create_wrapper: Callable[[Callable], Callable]):
+        setattr(instance, method_name, create_wrapper(getattr(instance, method_name)))
+
+    def wrap_timed_method(self, instance: Any, method_name: str, timing_name: str, counts_frames: bool = False):
+        def create_wrapper(method: Callable) -> Callable:
+            def timed_method(*args, **kwargs):
+                start_time = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    section_profile = self.section_profiles[-1]
+                    section_profile.timing_seconds[timing_name] += time.perf_counter() - start_time
+                    if counts_frames:
+                        section_profile.frame_count += 1
+            return timed_method
+        self.wrap_method(instance, method_name, create_wrapper)
+
+    def timed_next_section(self, next_section: Callable) -> Callable:
+        def wrapper(name: str = 'unnamed', *args, **kwargs):
+            self.section_profiles[-1].finish(self.scene)
+            self.section_profiles.append(SectionProfile(self.scene.section_index + 1, name))
+            next_section(name, *args, **kwargs)
+            # The renderer only picks up the new section's skip flag on its first play, the section itself has it.
+            self.section_profiles[-1].skipped = self.scene.renderer.file_writer.sections[-1].skip_animations
+        return wrapper
+
+    def render(self, preview: bool = False):
+        start_time = time.perf_counter()
+        self.scene.render(preview=preview)
+        self.render_seconds = time.perf_counter() - start_time
+        self.section_profiles[-1].finish(self.scene)
+
+    def report(self) -> Dict[str, Any]:
+        sub_scene_cache = getattr(self.scene, 'sub_scene_cache', None)
+        return {
+            'scene': type(self.scene).__name__,
+            'quality': config.quality,
+            'pixel_width': config.pixel_width,
+            'pixel_height': config.pixel_height,
+            'frame_rate': config.frame_rate,
+            'render_seconds': self.render_seconds,
+            'sub_scenes': [] if sub_scene_cache is None else sub_scene_cache.load_records,
+            'sections': [section_profile.to_dictionary() for section_profile in self.section_profiles],
+        }
+
+    def write_report(self, report_path: Path):
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(self.report(), indent=2))
+
+
+def format_summary_table(report: Dict[str, Any]) -> str:
+    lines = []
+    for sub_scene_record in report['sub_scenes']:
+        source = 'cache' if sub_scene_record['loaded_from_cache'] else 'constructed'
+        lines.append(f"{sub_scene_record['sub_scene']}: {sub_scene_record['seconds']:.2f}s ({source})")
+    header = (f"{'#':>4} {'section':<36} {'wall':>8} {'build':>8} {'interp':>8} {'raster':>8} {'encode':>8} "
+              f"{'frames':>7} {'mobjects':>9} {'points':>10} {'share':>6}")
+    lines.append(header)
+    lines.append('-' * len(header))
+    render_seconds = max(report['render_seconds'], 1e-9)
+    for section in report['sections']:
+        name = section['section_name'] + (' (skipped)' if section['skipped'] else '')
+        lines.append(f"{section['section_index']:>4} {name:<36.36} {section['wall_seconds']:>8.2f} "
+                     f"{section['construction_seconds']:>8.2f} {section['interpolation_seconds']:>8.2f} "
+                     f"{section['rasterization_seconds']:>8.2f} {section['encoding_seconds']:>8.2f} "
+                     f"{section['frame_count']:>7} {section['mobject_count']:>9} {section['point_count']:>10} "
+                     f"{section['wall_seconds'] / render_seconds:>6.1%}")
+    lines.append(f"Total render time {report['render_seconds']:.2f}s")
+    return '\n'.join(lines)
+
+
+def profile_render(scene: SectionedScene, report_path: Optional[Path] = None, preview: bool = False
+                   ) -> Dict[str, Any]:
+    profiler = RenderProfiler(scene)
+    profiler.render(preview=preview)
+    if report_path is not None:
+        profiler.write_report(report_path)
+    report = profiler.report()
+    print(format_summary_table(report))
+    return report
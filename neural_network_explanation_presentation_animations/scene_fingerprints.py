@@ -0,0 +1,114 @@
+from enum import Enum
+from functools import partial
+from types import CodeType, ModuleType
+from typing import Any, Iterable, Sequence, Set
+
+import numpy as np
+from colour import Color
+from manim import Animation, Mobject, config
+
+hashed_mobject_array_attributes = ('points', 'fill_rgbas', 'stroke_rgbas', 'background_stroke_rgbas', 'pixel_array')
+hashed_config_keys = ('pixel_width', 'pixel_height', 'frame_rate', 'background_color', 'background_opacity',
+                      'movie_file_extension')
+
+
+def update_hash_with_config(hasher):
+    for key in hashed_config_keys:
+        hasher.update(f'{key}={config[key]!r}'.encode())
+
+
+def update_hash_with_mobjects(hasher, mobjects: Iterable[Mobject]):
+    for mobject in mobjects:
+        for family_member in mobject.get_family():
+            hasher.update(type(family_member).__qualname__.encode())
+            hasher.update(f'z_index={family_member.z_index!r}'.encode())
+            hasher.update(f'stroke_width={getattr(family_member, "stroke_width", None)!r}'.encode())
+            asset_key = getattr(family_member, 'asset_key', None)
+            if asset_key is not None:
+                # Shared image assets are identified by their file and size, not by hashing every pixel each play.
+                hasher.update(f'asset_key={asset_key}'.encode())
+            for attribute_name in hashed_mobject_array_attributes:
+                if asset_key is not None and attribute_name == 'pixel_array':
+                    continue
+                value = getattr(family_member, attribute_name, None)
+                if isinstance(value, np.ndarray):
+                    hasher.update(attribute_name.encode())
+                    hasher.update(np.ascontiguousarray(value).tobytes())
+
+
+def update_hash_with_value(hasher, name: str, value: Any):
+    if isinstance(value, (bool, int, float, str)) or value is None:
+        hasher.update(f'{name}={value!r}'.encode())
+    elif isinstance(value, np.ndarray):
+        hasher.update(name.encode())
+        hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, Mobject):
+        hasher.update(name.encode())
+        update_hash_with_mobjects(hasher, [value])
+    elif isinstance(value, Animation):
+        hasher.update(name.encode())
+        update_hash_with_animation(hasher, value)
+    elif isinstance(value, (list, tuple)):
+        for element_index, element in enumerate(value):
+            update_hash_with_value(hasher, f'{name}[{element_index}]', element)
+    elif isinstance(value, dict):
+        for key, element in sorted(value.items(), key=lambda item: repr(item[0])):
+            update_hash_with_value(hasher, f'{name}[{key!r}]', element)
+    elif isinstance(value, (set, frozenset)):
+        hasher.update(f'{name}={sorted(repr(element) for element in value)!r}'.encode())
+    elif isinstance(value, partial):
+        update_hash_with_value(hasher, f'{name}.func', value.func)
+        update_hash_with_value(hasher, f'{name}.args', value.args)
+        update_hash_with_value(hasher, f'{name}.keywords', value.keywords)
+    elif hasattr(value, '__code__'):
+        update_hash_with_function(hasher, name, value, set())
+    elif isinstance(value, (Color, Enum)):
+        hasher.update(f'{name}={value!r}'.encode())
+    else:
+        # Anything else is hashed by its representation. One that only shows the object's address never matches
+        # again, so such a section is rendered anew rather than reused stale.
+        hasher.update(f'{name}={type(value).__qualname__}:{value!r}'.encode())
+
+
+def update_hash_with_code(hasher, code: CodeType):
+    hasher.update(code.co_code)
+    hasher.update(repr(code.co_names).encode())
+    for constant in code.co_consts:
+        if isinstance(constant, CodeType):
+            update_hash_with_code(hasher, constant)  # Nested functions and lambdas.
+        else:
+            hasher.update(repr(constant).encode())
+
+
+def update_hash_with_function(hasher, name: str, function: Any, visited_codes: Set[CodeType]):
+    # Rate functions and the functions passed to `ApplyFunction` are identified by their compiled code and by
+    # everything that code reads: defaults, captured closure values and referenced module globals.
+    hasher.update(f'{name}={function.__qualname__}'.encode())
+    code = function.__code__
+    if code in visited_codes:
+        return  # Recursive references were already hashed.
+    visited_codes.add(code)
+    update_hash_with_code(hasher, code)
+    update_hash_with_function_inputs(hasher, f'{name}.__defaults__', function.__defaults__ or (), visited_codes)
+    closure_values = [cell.cell_contents for cell in function.__closure__ or ()]
+    update_hash_with_function_inputs(hasher, f'{name}.__closure__', closure_values, visited_codes)
+    global_values = [function.__globals__[global_name] for global_name in code.co_names
+                     if global_name in getattr(function, '__globals__', {})]
+    update_hash_with_function_inputs(hasher, f'{name}.__globals__', global_values, visited_codes)
+
+
+def update_hash_with_function_inputs(hasher, name: str, values: Sequence[Any], visited_codes: Set[CodeType]):
+    for value_index, value in enumerate(values):
+        value_name = f'{name}[{value_index}]'
+        if hasattr(value, '__code__'):
+            update_hash_with_function(hasher, value_name, value, visited_codes)
+        elif isinstance(value, (ModuleType, type)):
+            hasher.update(f'{value_name}={value.__name__}'.encode())  # Modules and classes are covered by versions.
+        else:
+            update_hash_with_value(hasher, value_name, value)
+
+
+def update_hash_with_animation(hasher, animation: Any):
+    hasher.update(type(animation).__qualname__.encode())
+    for name, value in sorted(vars(animation).items()):
+        update_hash_with_value(hasher, name, value)
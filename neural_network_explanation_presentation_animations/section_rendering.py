@@ -0,0 +1,171 @@
+import copy
+import multiprocessing
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type
+
+from manim import config, logger, tempconfig
+
+from neural_network_explanation_presentation_animations.configuration import set_up_configuration
+from neural_network_explanation_presentation_animations.sectioned_scene import SectionedScene, \
+    RoundRobinSectionSelection, SectionSelection, SectionIndexSelection
+
+
+def concatenate_videos(video_paths: List[Path], output_path: Path):
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    concatenation_list_path = output_path.with_suffix('.txt')
+    concatenation_list_path.write_text(''.join(f"file '{video_path.resolve()}'\n" for video_path in video_paths))
+    subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                    '-i', str(concatenation_list_path), '-c', 'copy', str(output_path)], check=True)
+    concatenation_list_path.unlink()
+
+
+def set_up_worker_configuration(config_overrides: Dict[str, Any]):
+    set_up_configuration()
+    for key, value in config_overrides.items():
+        config[key] = value
+
+
+def render_sections_in_worker(scene_class: Type[SectionedScene], section_selection: SectionSelection,
+                              worker_media_directory: Path, config_overrides: Dict[str, Any]) -> Dict[int, Path]:
+    set_up_worker_configuration(config_overrides)
+    # Each worker gets its own media directory so partial movie files never collide.
+    config.media_dir = str(worker_media_directory)
+    scene = scene_class(section_selection=section_selection)
+    scene.render()
+    sections_output_directory = Path(scene.renderer.file_writer.sections_output_dir)
+    section_video_paths: Dict[int, Path] = {}
+    for section_index, section_video in scene.section_videos.items():
+        section_video_path = sections_output_directory.joinpath(section_video)
+        if section_video_path.exists():  # Sections without animations produce no video.
+            section_video_paths[section_index] = section_video_path
+    return section_video_paths
+
+
+def list_sections(scene_class: Type[SectionedScene]) -> Dict[int, str]:
+    with tempconfig({'dry_run': True}):
+        scene = scene_class(section_selection=SectionIndexSelection([]))
+        scene.render()
+    return scene.section_names
+
+
+def fingerprint_sections_in_worker(scene_class: Type[SectionedScene], config_overrides: Dict[str, Any]
+                                   ) -> Dict[int, str]:
+    set_up_worker_configuration(config_overrides)
+    # Skipping every section fast-forwards the scene state without rasterizing or writing any frames.
+    with tempconfig({'dry_run': True}):
+        scene = scene_class(section_selection=SectionIndexSelection([]))
+        scene.render()
+    return scene.get_section_fingerprints()
+
+
+def count_selected_sections(scene_class: Type[SectionedScene], section_selection: Optional[SectionSelection]) -> int:
+    if isinstance(section_selection, SectionIndexSelection):
+        return len(section_selection.section_indexes)
+    if section_selection is None:
+        section_selection = SectionSelection()
+    # Range selections track where they are, so a copy is matched against the listed sections.
+    section_selection = copy.deepcopy(section_selection)
+    return sum(section_selection.includes(section_index, section_name)
+               for section_index, section_name in list_sections(scene_class).items())
+
+
+def render_section_videos(scene_class: Type[SectionedScene], work_directory: Path,
+                          section_selection: Optional[SectionSelection] = None, worker_count: Optional[int] = None,
+                          config_overrides: Optional[Dict[str, Any]] = None) -> Dict[int, Path]:
+    if worker_count is None:
+        worker_count = os.cpu_count()
+    if config_overrides is None:
+        config_overrides = {}
+    # Every worker replays the scene up to its sections, so a worker without a section would only waste that work.
+    if worker_count > 1:
+        worker_count = max(1, min(worker_count, count_selected_sections(scene_class, section_selection)))
+    # Every worker fast-forwards through the sections it does not own, so each renders a disjoint share of the
+    # sections starting from the same scene state a serial render would reach.
+    section_video_paths: Dict[int, Path] = {}
+    with ProcessPoolExecutor(max_workers=worker_count, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [executor.submit(render_sections_in_worker, scene_class,
+                                   RoundRobinSectionSelection(worker_index, worker_count, section_selection),
+                                   work_directory.joinpath('workers', f'worker_{worker_index}'), config_overrides)
+                   for worker_index in range(worker_count)]
+        for future in futures:
+            section_video_paths.update(future.result())
+    return section_video_paths
+
+
+def assemble_sections(scene_name: str, section_video_paths: Dict[int, Path], output_directory: Path) -> Path:
+    if len(section_video_paths) == 0:
+        raise Exception(f'No section of {scene_name} produced a video, check that the selected sections exist and '
+                        f'contain animations.')
+    sections_directory = output_directory.joinpath('sections')
+    sections_directory.mkdir(parents=True, exist_ok=True)
+    ordered_section_video_paths: List[Path] = []
+    for section_index in sorted(section_video_paths):
+        section_video_path = section_video_paths[section_index]
+        ordered_section_video_path = sections_directory.joinpath(
+            f'{scene_name}_{section_index:04}{section_video_path.suffix}')
+        shutil.copyfile(section_video_path, ordered_section_video_path)
+        ordered_section_video_paths.append(ordered_section_video_path)
+    movie_path = output_directory.joinpath(f'{scene_name}{ordered_section_video_paths[0].suffix}')
+    concatenate_videos(ordered_section_video_paths, movie_path)
+    return movie_path
+
+
+def render_sections_in_parallel(scene_class: Type[SectionedScene], worker_count: Optional[int] = None,
+                                output_directory: Optional[Path] = None,
+                                section_selection: Optional[SectionSelection] = None,
+                                config_overrides: Optional[Dict[str, Any]] = None) -> Path:
+    if output_directory is None:
+        output_directory = Path(config.media_dir).joinpath('parallel_renders', scene_class.__name__)
+    section_video_paths = render_section_videos(scene_class, output_directory, section_selection=section_selection,
+                                                worker_count=worker_count, config_overrides=config_overrides)
+    movie_path = assemble_sections(scene_class.__name__, section_video_paths, output_directory)
+    logger.info(f'Rendered {len(section_video_paths)} sections to {movie_path}')
+    return movie_path
+
+
+def render_sections_incrementally(scene_class: Type[SectionedScene], worker_count: Optional[int] = None,
+                                  output_directory: Optional[Path] = None,
+                                  section_cache_directory: Optional[Path] = None,
+                                  config_overrides: Optional[Dict[str, Any]] = None) -> Path:
+    if output_directory is None:
+        output_directory = Path(config.media_dir).joinpath('incremental_renders', scene_class.__name__)
+    if section_cache_directory is None:
+        section_cache_directory = Path(config.media_dir).joinpath('section_cache', scene_class.__name__)
+    if config_overrides is None:
+        config_overrides = {}
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        section_fingerprints = executor.submit(fingerprint_sections_in_worker, scene_class, config_overrides).result()
+    cached_section_video_paths: Dict[int, Path] = {}
+    changed_section_indexes: List[int] = []
+    for section_index, section_fingerprint in section_fingerprints.items():
+        matching_cache_paths = list(section_cache_directory.glob(f'{section_fingerprint}.*'))
+        if len(matching_cache_paths) > 0:
+            cached_section_video_paths[section_index] = matching_cache_paths[0]
+        else:
+            changed_section_indexes.append(section_index)
+    logger.info(f'Reusing {len(cached_section_video_paths)} cached sections, '
+                f'rendering {len(changed_section_indexes)} changed sections')
+    if len(changed_section_indexes) > 0:
+        rendered_section_video_paths = render_section_videos(
+            scene_class, output_directory, section_selection=SectionIndexSelection(changed_section_indexes),
+            worker_count=worker_count, config_overrides=config_overrides)
+        section_cache_directory.mkdir(parents=True, exist_ok=True)
+        for section_index, section_video_path in rendered_section_video_paths.items():
+            section_cache_path = section_cache_directory.joinpath(
+                f'{section_fingerprints[section_index]}{section_video_path.suffix}')
+            shutil.move(str(section_video_path), section_cache_path)
+            cached_section_video_paths[section_index] = section_cache_path
+    movie_path = assemble_sections(scene_class.__name__, cached_section_video_paths, output_directory)
+    logger.info(f'Assembled {len(cached_section_video_paths)} sections to {movie_path}')
+    return movie_path
+
+
+if __name__ == '__main__':
+    from neural_network_explanation_presentation_animations.main_scene import MainScene
+
+    set_up_configuration()
+    render_sections_incrementally(MainScene)
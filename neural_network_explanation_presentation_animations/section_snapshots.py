@@ -0,0 +1,94 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import manim
+import numpy as np
+from manim import config, logger, Mobject
+
+from neural_network_explanation_presentation_animations.configuration import get_render_mode
+from neural_network_explanation_presentation_animations.sectioned_scene import SectionedScene
+from neural_network_explanation_presentation_animations.sub_scene_cache import package_source_hash
+
+snapshot_camera_attributes = ('frame_center', 'frame_width', 'frame_height')
+
+
+class SectionSnapshot:
+    def __init__(self, section_index: int, section_name: str, mobjects: List[Mobject],
+                 foreground_mobjects: List[Mobject], built_resources: Dict[str, Any], values: Dict[str, Any],
+                 camera_state: Dict[str, Any]):
+        self.section_index: int = section_index
+        self.section_name: str = section_name
+        # Everything is pickled as one object graph, so mobjects shared between the scene and the resources stay
+        # shared once restored.
+        self.mobjects: List[Mobject] = mobjects
+        self.foreground_mobjects: List[Mobject] = foreground_mobjects
+        self.built_resources: Dict[str, Any] = built_resources
+        self.values: Dict[str, Any] = values
+        self.camera_state: Dict[str, Any] = camera_state
+
+
+def capture_camera_state(scene: SectionedScene) -> Dict[str, Any]:
+    camera_state = {}
+    for attribute_name in snapshot_camera_attributes:
+        value = getattr(scene.renderer.camera, attribute_name, None)
+        if value is not None:
+            camera_state[attribute_name] = np.copy(value) if isinstance(value, np.ndarray) else value
+    return camera_state
+
+
+def restore_camera_state(scene: SectionedScene, camera_state: Dict[str, Any]):
+    for attribute_name, value in camera_state.items():
+        setattr(scene.renderer.camera, attribute_name, value)
+
+
+class SectionSnapshotStore:
+    def __init__(self, scene_name: str, snapshot_directory: Optional[Path] = None, save_snapshots: bool = True):
+        if snapshot_directory is None:
+            snapshot_directory = Path(config.media_dir).joinpath('section_snapshots', scene_name)
+        # Snapshots from other sources or modes hold different mobjects, so each gets its own directory.
+        hasher = hashlib.sha256()
+        hasher.update(manim.__version__.encode())
+        hasher.update(package_source_hash().encode())
+        hasher.update(f'render_mode={get_render_mode()}'.encode())
+        hasher.update(f'{config.pixel_width}x{config.pixel_height}@{config.frame_rate}'.encode())
+        self.snapshot_directory: Path = snapshot_directory.joinpath(hasher.hexdigest()[:16])
+        self.save_snapshots: bool = save_snapshots
+
+    def snapshot_path(self, section_index: int, section_name: str) -> Path:
+        return self.snapshot_directory.joinpath(f'{section_index:04}_{section_name}.pickle')
+
+    def has_snapshot(self, section_index: int, section_name: str) -> bool:
+        return self.snapshot_path(section_index, section_name).exists()
+
+    def save(self, snapshot: SectionSnapshot):
+        snapshot_path = self.snapshot_path(snapshot.section_index, snapshot.section_name)
+        # Write to a temporary path first so concurrent renders never read a partially written snapshot.
+        temporary_snapshot_path = snapshot_path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            self.snapshot_directory.mkdir(parents=True, exist_ok=True)
+            with temporary_snapshot_path.open('wb') as snapshot_file:
+                pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_snapshot_path, snapshot_path)
+        except (pickle.PicklingError, TypeError, AttributeError, OSError) as error:
+            # Updaters holding lambdas or open handles cannot be pickled, the render goes on without the snapshot.
+            logger.warning(f'Not saving the snapshot of section {snapshot.section_index} {snapshot.section_name}, '
+                           f'it could not be pickled: {error}')
+        finally:
+            temporary_snapshot_path.unlink(missing_ok=True)  # Only left when pickling failed.
+
+    def load(self, section_index: int, section_name: str) -> Optional[SectionSnapshot]:
+        snapshot_path = self.snapshot_path(section_index, section_name)
+        try:
+            with snapshot_path.open('rb') as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            logger.warning(f'Discarding unreadable section snapshot {snapshot_path}')
+            snapshot_path.unlink(missing_ok=True)
+            return None
+        logger.info(f'Starting from the snapshot of section {section_index} {section_name}')
+        return snapshot
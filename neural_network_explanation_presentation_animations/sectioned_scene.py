@@ -0,0 +1,114 @@
+import hashlib
+from typing import Dict, Optional, Iterable, Set, Union
+
+from manim import Scene, DefaultSectionType
+from manim.utils.exceptions import EndSceneEarlyException
+
+from neural_network_explanation_presentation_animations.scene_fingerprints import update_hash_with_config, \
+    update_hash_with_mobjects, update_hash_with_value
+
+
+class SectionSelection:
+    def includes(self, section_index: int, section_name: str) -> bool:
+        return True
+
+    def ends_before(self, section_index: int, section_name: str) -> bool:
+        return False
+
+
+class SectionIndexSelection(SectionSelection):
+    def __init__(self, section_indexes: Iterable[int]):
+        self.section_indexes: Set[int] = set(section_indexes)
+
+    def includes(self, section_index: int, section_name: str) -> bool:
+        return section_index in self.section_indexes
+
+
+class RoundRobinSectionSelection(SectionSelection):
+    def __init__(self, worker_index: int, worker_count: int, base_selection: Optional[SectionSelection] = None):
+        if base_selection is None:
+            base_selection = SectionSelection()
+        self.worker_index: int = worker_index
+        self.worker_count: int = worker_count
+        self.base_selection: SectionSelection = base_selection
+
+    def includes(self, section_index: int, section_name: str) -> bool:
+        return (self.base_selection.includes(section_index, section_name) and
+                section_index % self.worker_count == self.worker_index)
+
+    def ends_before(self, section_index: int, section_name: str) -> bool:
+        return self.base_selection.ends_before(section_index, section_name)
+
+
+class SectionRangeSelection(SectionSelection):
+    def __init__(self, first_section: Union[int, str, None] = None, last_section: Union[int, str, None] = None):
+        self.first_section: Union[int, str, None] = first_section
+        self.last_section: Union[int, str, None] = last_section
+        self.started: bool = first_section is None
+        self.finished: bool = False
+
+    @staticmethod
+    def matches(section: Union[int, str], section_index: int, section_name: str) -> bool:
+        if isinstance(section, int):
+            return section == section_index
+        return section == section_name
+
+    def includes(self, section_index: int, section_name: str) -> bool:
+        if not self.started and self.matches(self.first_section, section_index, section_name):
+            self.started = True
+        if not self.started or self.finished:
+            return False
+        if self.last_section is not None and self.matches(self.last_section, section_index, section_name):
+            self.finished = True
+        return True
+
+    def ends_before(self, section_index: int, section_name: str) -> bool:
+        return self.finished
+
+
+class SectionedScene(Scene):
+    def __init__(self, section_selection: Optional[SectionSelection] = None, **kwargs):
+        super().__init__(**kwargs)
+        if section_selection is None:
+            section_selection = SectionSelection()
+        self.section_selection: SectionSelection = section_selection
+        self.section_index: int = -1
+        self.section_names: Dict[int, str] = {}
+        self.section_videos: Dict[int, str] = {}
+        self.section_hashers: Dict[int, 'hashlib._Hash'] = {}
+
+    def next_section(self, name: str = 'unnamed', type: str = DefaultSectionType.NORMAL,
+                     skip_animations: bool = False) -> None:
+        self.section_index += 1
+        self.section_names[self.section_index] = name
+        if self.section_selection.ends_before(self.section_index, name):
+            # Nothing after the last selected section is needed, so stop constructing the scene entirely.
+            raise EndSceneEarlyException()
+        if not self.section_selection.includes(self.section_index, name):
+            skip_animations = True
+        super().next_section(name=name, type=type, skip_animations=skip_animations)
+        section_video = self.renderer.file_writer.sections[-1].video
+        if section_video is not None:
+            self.section_videos[self.section_index] = section_video
+
+    def play(self, *args, **kwargs):
+        if self.section_index >= 0:
+            self.update_section_fingerprint(*args, **kwargs)
+        super().play(*args, **kwargs)
+
+    def update_section_fingerprint(self, *args, **kwargs):
+        # A section's fingerprint covers the scene state at each play call and the animations played, which together
+        # determine every frame the section renders.
+        hasher = self.section_hashers.get(self.section_index)
+        if hasher is None:
+            hasher = hashlib.sha256()
+            update_hash_with_config(hasher)
+            self.section_hashers[self.section_index] = hasher
+        update_hash_with_mobjects(hasher, self.mobjects)
+        for argument_index, argument in enumerate(args):
+            update_hash_with_value(hasher, f'argument[{argument_index}]', argument)
+        for name, value in sorted(kwargs.items()):
+            update_hash_with_value(hasher, name, value)
+
+    def get_section_fingerprints(self) -> Dict[int, str]:
+        return {section_index: hasher.hexdigest() for section_index, hasher in self.section_hashers.items()}
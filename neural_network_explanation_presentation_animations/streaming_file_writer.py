@@ -0,0 +1,128 @@
+import json
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from manim import config, logger, DefaultSectionType
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.scene.scene_file_writer import SceneFileWriter
+from manim.scene.section import Section
+
+
+class EncoderTarget:
+    def __init__(self, name: str, extension: str, codec_arguments: Sequence[str]):
+        self.name: str = name
+        self.extension: str = extension
+        self.codec_arguments: List[str] = list(codec_arguments)
+
+
+h264_preview_target = EncoderTarget('preview', '.mp4', ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23',
+                                                        '-pix_fmt', 'yuv420p'])
+prores_master_target = EncoderTarget('master', '.mov', ['-c:v', 'prores_ks', '-profile:v', '4444',
+                                                        '-pix_fmt', 'yuva444p10le'])
+default_encoder_targets = (h264_preview_target, prores_master_target)
+streaming_config_overrides: Dict[str, Any] = {'disable_caching': True}
+
+
+class StreamingSceneFileWriter(SceneFileWriter):
+    encoder_targets: Sequence[EncoderTarget] = default_encoder_targets
+
+    def __init__(self, renderer, scene_name: str, **kwargs):
+        # Set before the base initializer, which opens the first section.
+        self.section_markers: List[Dict[str, Any]] = []
+        self.streamed_frame_count: int = 0
+        self.encoder_processes: Optional[Dict[str, subprocess.Popen]] = None
+        super().__init__(renderer, scene_name, **kwargs)
+        if config.write_to_movie:
+            self.base_movie_file_path: Path = Path(self.movie_file_path)
+            # Previewing opens the first target's movie.
+            self.movie_file_path = self.encoder_output_path(self.encoder_targets[0])
+
+    def encoder_output_path(self, encoder_target: EncoderTarget) -> Path:
+        return self.base_movie_file_path.with_name(f'{self.output_name}_{encoder_target.name}'
+                                                   f'{encoder_target.extension}')
+
+    def section_markers_path(self) -> Path:
+        return self.base_movie_file_path.with_name(f'{self.output_name}_sections.json')
+
+    def open_encoders(self):
+        self.encoder_processes = {}
+        for encoder_target in self.encoder_targets:
+            output_path = self.encoder_output_path(encoder_target)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            command = ['ffmpeg', '-y', '-loglevel', 'error',
+                       '-f', 'rawvideo', '-s', f'{config.pixel_width}x{config.pixel_height}', '-pix_fmt', 'rgba',
+                       '-r', str(config.frame_rate), '-i', '-',
+                       *encoder_target.codec_arguments, str(output_path)]
+            self.encoder_processes[encoder_target.name] = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def close_encoders(self):
+        if self.encoder_processes is None:
+            return
+        for encoder_process in self.encoder_processes.values():
+            encoder_process.stdin.close()
+        for encoder_target_name, encoder_process in self.encoder_processes.items():
+            if encoder_process.wait() != 0:
+                raise Exception(f'The {encoder_target_name} encoder exited with code {encoder_process.returncode}.')
+        self.encoder_processes = None
+
+    def next_section(self, name: str = 'unnamed', type: str = DefaultSectionType.NORMAL,
+                     skip_animations: bool = False) -> None:
+        if (len(self.section_markers) > 0 and self.section_markers[-1]['name'] == 'autocreated' and
+                self.section_markers[-1]['start_frame'] == self.streamed_frame_count):
+            self.section_markers.pop()  # Drop the automatic first section when nothing was played in it.
+        self.section_markers.append({'name': name, 'type': type, 'skipped': skip_animations,
+                                     'start_frame': self.streamed_frame_count})
+        # Sections never get their own video, they are marked within the streamed movies instead.
+        self.sections.append(Section(type, None, name, skip_animations))
+
+    def begin_animation(self, allow_write: bool = False, file_path=None):
+        pass
+
+    def end_animation(self, allow_write: bool = False):
+        pass
+
+    def write_frame(self, frame_or_renderer):
+        if not config.write_to_movie:
+            return
+        if self.encoder_processes is None:
+            self.open_encoders()
+        frame_bytes = frame_or_renderer.tobytes()
+        for encoder_process in self.encoder_processes.values():
+            encoder_process.stdin.write(frame_bytes)
+        self.streamed_frame_count += 1
+
+    def write_section_markers(self):
+        section_markers = []
+        for section_index, section_marker in enumerate(self.section_markers):
+            end_frame = (self.section_markers[section_index + 1]['start_frame']
+                         if section_index + 1 < len(self.section_markers) else self.streamed_frame_count)
+            section_markers.append({
+                'index': section_index,
+                **section_marker,
+                'end_frame': end_frame,
+                'start_seconds': section_marker['start_frame'] / config.frame_rate,
+                'end_seconds': end_frame / config.frame_rate,
+            })
+        self.section_markers_path().parent.mkdir(parents=True, exist_ok=True)
+        self.section_markers_path().write_text(json.dumps({
+            'frame_rate': config.frame_rate,
+            'movies': {encoder_target.name: str(self.encoder_output_path(encoder_target))
+                       for encoder_target in self.encoder_targets},
+            'sections': section_markers,
+        }, indent=2))
+
+    def finish(self):
+        if not config.write_to_movie:
+            return
+        self.close_encoders()
+        self.write_section_markers()
+        for encoder_target in self.encoder_targets:
+            logger.info(f'Streamed {self.streamed_frame_count} frames to {self.encoder_output_path(encoder_target)}')
+        logger.info(f'Wrote section markers to {self.section_markers_path()}')
+
+
+def create_streaming_renderer() -> CairoRenderer:
+    # Frames go straight to the encoders, so there are no partial movie files for the play cache to reuse. Render
+    # with `streaming_config_overrides` applied.
+    return CairoRenderer(file_writer_class=StreamingSceneFileWriter)
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+import manim
+from manim import config, logger
+
+from neural_network_explanation_presentation_animations.configuration import get_render_mode
+
+SubScene = TypeVar('SubScene')
+
+package_directory = Path(__file__).parent
+
+
+def package_source_hash() -> str:
+    hasher = hashlib.sha256()
+    for source_path in sorted(package_directory.glob('*.py')):
+        hasher.update(source_path.name.encode())
+        hasher.update(source_path.read_bytes())
+    return hasher.hexdigest()
+
+
+class SubSceneCache:
+    def __init__(self, cache_directory: Optional[Path] = None, maximum_size_in_bytes: int = 2 * 1024 ** 3):
+        if cache_directory is None:
+            cache_directory = Path(config.media_dir).joinpath('sub_scene_cache')
+        self.cache_directory: Path = cache_directory
+        self.maximum_size_in_bytes: int = maximum_size_in_bytes
+        self.source_hash: str = package_source_hash()
+        self.load_records: List[Dict[str, Any]] = []
+
+    def key(self, sub_scene_class: Type[SubScene], **parameters: Any) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(f'{sub_scene_class.__module__}.{sub_scene_class.__qualname__}'.encode())
+        hasher.update(repr(sorted(parameters.items())).encode())
+        hasher.update(manim.__version__.encode())
+        hasher.update(self.source_hash.encode())
+        hasher.update(f'render_mode={get_render_mode()}'.encode())  # Proxy sub-scenes hold placeholders.
+        # Images are downsampled to the output resolution when a sub-scene is built.
+        hasher.update(f'{config.pixel_width}x{config.pixel_height}@{config.frame_rate}'.encode())
+        return hasher.hexdigest()
+
+    def load_or_create(self, sub_scene_class: Type[SubScene], **parameters: Any) -> SubScene:
+        start_time = time.perf_counter()
+        sub_scene, loaded_from_cache = self.load_or_create_untimed(sub_scene_class, **parameters)
+        self.load_records.append({'sub_scene': sub_scene_class.__name__, 'parameters': repr(parameters),
+                                  'loaded_from_cache': loaded_from_cache,
+                                  'seconds': time.perf_counter() - start_time})
+        return sub_scene
+
+    def load_or_create_untimed(self, sub_scene_class: Type[SubScene], **parameters: Any) -> (SubScene, bool):
+        cache_path = self.cache_directory.joinpath(f'{self.key(sub_scene_class, **parameters)}.pickle')
+        if cache_path.exists():
+            try:
+                with cache_path.open('rb') as cache_file:
+                    sub_scene = pickle.load(cache_file)
+                os.utime(cache_path)  # Mark as recently used for eviction.
+                logger.info(f'Loaded {sub_scene_class.__name__} from sub-scene cache {cache_path}')
+                return sub_scene, True
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                logger.warning(f'Discarding unreadable sub-scene cache entry {cache_path}')
+                cache_path.unlink(missing_ok=True)
+        sub_scene = sub_scene_class(**parameters)
+        # Write to a temporary path first so concurrent renders never read a partially written entry.
+        temporary_cache_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            self.cache_directory.mkdir(parents=True, exist_ok=True)
+            with temporary_cache_path.open('wb') as cache_file:
+                pickle.dump(sub_scene, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_cache_path, cache_path)
+        except (pickle.PicklingError, TypeError, AttributeError, OSError) as error:
+            # The cache is only an optimisation, the sub-scene is already built.
+            logger.warning(f'Not caching {sub_scene_class.__name__}, it could not be pickled: {error}')
+            return sub_scene, False
+        finally:
+            temporary_cache_path.unlink(missing_ok=True)  # Only left when pickling failed.
+        self.evict_least_recently_used()
+        return sub_scene, False
+
+    def evict_least_recently_used(self):
+        cache_entries = []
+        for cache_path in self.cache_directory.glob('*.pickle'):
+            try:
+                cache_stat = cache_path.stat()
+            except FileNotFoundError:
+                continue  # Evicted by a concurrent render.
+            cache_entries.append((cache_stat.st_mtime, cache_stat.st_size, cache_path))
+        cache_entries.sort()
+        total_size_in_bytes = sum(size for _, size, _ in cache_entries)
+        for _, size, cache_path in cache_entries[:-1]:  # Never evict the most recently used entry.
+            if total_size_in_bytes <= self.maximum_size_in_bytes:
+                break
+            total_size_in_bytes -= size
+            cache_path.unlink(missing_ok=True)
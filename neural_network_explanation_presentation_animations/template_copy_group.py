@@ -0,0 +1,14 @@
+import numpy as np
+from manim import VGroup, Mobject
+
+
+class TemplateCopyGroup(VGroup):
+    def __init__(self, template: Mobject, offsets: np.ndarray, **kwargs):
+        # The template is built once and every member is a shifted copy of it, so nothing is constructed per member.
+        self.offsets: np.ndarray = np.array(offsets, dtype=float).reshape(-1, 3)
+        copies = [template.copy().shift(offset) for offset in self.offsets]
+        super().__init__(*copies, **kwargs)
+
+    @property
+    def copy_count(self) -> int:
+        return len(self.submobjects)
@@ -4,37 +4,54 @@ from typing import List
 
 import numpy as np
 from manim import Scene, Circle, PINK, Create, config, ImageMobject, RIGHT, Rectangle, FadeIn, FadeOut, BLACK, \
-    ReplacementTransform, FadeTransform, DOWN, Dot, ThreeDScene, Sphere, PI, TAU, RED, VGroup, Line3D, IN, Surface, \
-    Mobject, OUT, LaggedStart
+    ReplacementTransform, FadeTransform, DOWN, Dot, ThreeDScene, Sphere, PI, TAU, RED, VGroup, Line3D, IN, Polygon, \
+    Mobject, OUT, LaggedStart, BLUE_D, LIGHT_GREY
+
+from neural_network_explanation_presentation_animations.batched_animations import TemplateCopyLaggedFadeIn
+from neural_network_explanation_presentation_animations.configuration import set_up_configuration
+from neural_network_explanation_presentation_animations.image_assets import image_asset_registry
+from neural_network_explanation_presentation_animations.template_copy_group import TemplateCopyGroup
+from neural_network_explanation_presentation_animations.level_of_detail import mesh_resolution, MeshTemplateCache
 
 
 class ThreeDNeuronsLookingAtPixelsScene(ThreeDScene):
+    def __init__(self, number_of_pixels: int = 10, **kwargs):
+        super().__init__(**kwargs)
+        self.number_of_pixels: int = number_of_pixels
+
     def construct(self):
-        planetary_nebula_image_mobject = ImageMobject(
-            Path('neural_network_explanation_presentation_animations/images/grayscale_ngc7293_planetary_nebula.jpg'))
         image_large_size = 6.0
-        number_of_pixels = 10
+        planetary_nebula_image_mobject = image_asset_registry.create_image_mobject(
+            Path('neural_network_explanation_presentation_animations/images/grayscale_ngc7293_planetary_nebula.jpg'),
+            width=image_large_size)
+        number_of_pixels = self.number_of_pixels
         assert number_of_pixels % 2 == 0
-        # 32 seems to be the default?
-        line3d_resolution = 5
-        sphere_resolution = 5
-        xy_rectangle_resolution = (5, 5)
+        pixel_size = image_large_size / number_of_pixels
+        neuron_radius = (2 * pixel_size) / 5
+        line3d_thickness = 0.02
+        line3d_resolution = (mesh_resolution(image_large_size), mesh_resolution(math.tau * line3d_thickness))
+        sphere_resolution = (mesh_resolution(math.tau * neuron_radius), mesh_resolution(math.pi * neuron_radius))
+        mesh_template_cache = MeshTemplateCache()
         skip_animations = True
         # Create image.
         self.next_section(skip_animations=skip_animations)
-        planetary_nebula_image_mobject.scale_to_fit_width(image_large_size)
         self.add(planetary_nebula_image_mobject)
         # Convert image to grid.
         self.next_section(skip_animations=skip_animations)
-        pixel_size = image_large_size / number_of_pixels
         pixel_grid = VGroup()
         for x_position in np.linspace(-image_large_size / 2, image_large_size / 2, num=number_of_pixels + 1):
-            line = Line3D([x_position, -image_large_size / 2, 0], [x_position, image_large_size / 2, 0], color=BLACK,
-                          resolution=line3d_resolution)
+            line = mesh_template_cache.create(
+                'vertical_line',
+                lambda: Line3D([0, -image_large_size / 2, 0], [0, image_large_size / 2, 0], color=BLACK,
+                               thickness=line3d_thickness, resolution=line3d_resolution),
+                shift=np.array([x_position, 0, 0]))
             pixel_grid.add(line)
         for y_position in np.linspace(-image_large_size / 2, image_large_size / 2, num=number_of_pixels + 1):
-            line = Line3D([-image_large_size / 2, y_position, 0], [image_large_size / 2, y_position, 0], color=BLACK,
-                          resolution=line3d_resolution)
+            line = mesh_template_cache.create(
+                'horizontal_line',
+                lambda: Line3D([-image_large_size / 2, 0, 0], [image_large_size / 2, 0, 0], color=BLACK,
+                               thickness=line3d_thickness, resolution=line3d_resolution),
+                shift=np.array([0, y_position, 0]))
             pixel_grid.add(line)
         self.add(pixel_grid)
         self.play(FadeOut(planetary_nebula_image_mobject), FadeIn(pixel_grid))
@@ -43,32 +60,26 @@ class ThreeDNeuronsLookingAtPixelsScene(ThreeDScene):
             x_position_ = (-image_large_size / 2) + (pixel_size / 2) + (x_index * pixel_size)
             y_position_ = (image_large_size / 2) - (pixel_size / 2) - (y_index * pixel_size)
             return x_position_, y_position_
-        def create_neuron_kernel(x_center, y_center) -> XyRectangle:
+        def create_neuron_kernel_template() -> XyRectangle:
             kernel_size = (3 * pixel_size)
-            x = x_center - (kernel_size / 2)
-            y = y_center - (kernel_size / 2)
-            neuron_kernel_ = XyRectangle(x=x, y=y, x_size=kernel_size, y_size=kernel_size,
-                                         resolution=xy_rectangle_resolution)
+            neuron_kernel_ = XyRectangle(x=-kernel_size / 2, y=-kernel_size / 2, x_size=kernel_size, y_size=kernel_size)
             neuron_kernel_.set_opacity(0.5)
             neuron_kernel_.set_color(RED)
             return neuron_kernel_
 
-        def create_neuron_output(x_center, y_center) -> XyRectangle:
+        def create_neuron_output_template() -> XyRectangle:
             size = 0.9 * pixel_size
-            x = x_center - (size / 2)
-            y = y_center - (size / 2)
-            neuron_kernel_ = XyRectangle(x=x, y=y, x_size=size, y_size=size, z=2,
-                                         resolution=xy_rectangle_resolution)
+            neuron_kernel_ = XyRectangle(x=-size / 2, y=-size / 2, x_size=size, y_size=size, z=2)
             neuron_kernel_.set_opacity(0.5)
             neuron_kernel_.set_color(RED)
             return neuron_kernel_
 
-        def create_neuron(x, y):
+        def create_neuron_template() -> Sphere:
             neuron_z_position = 1
             neuron_ = Sphere(
-                center=(x, y, neuron_z_position),
-                radius=((2 * pixel_size) / 5),
-                resolution=(sphere_resolution, sphere_resolution),
+                center=(0, 0, neuron_z_position),
+                radius=neuron_radius,
+                resolution=sphere_resolution,
                 sheen_factor=0.0,
                 stroke_opacity=0.0,
                 fill_opacity=1.0,
@@ -77,65 +88,65 @@ class ThreeDNeuronsLookingAtPixelsScene(ThreeDScene):
             neuron_.set_color(RED)
             return neuron_
 
-        neurons: List[List[Mobject]] = []
-        neuron_kernels: List[List[Mobject]] = []
-        neuron_outputs: List[List[Mobject]] = []
+        # Copies are laid out x major, so the copy of neuron (x, y) is `x * neurons_per_row + y`.
+        neurons_per_row = number_of_pixels - 2
+        neuron_offsets = []
         for pixel_index_x in range(1, number_of_pixels-1):
-            neurons.append([])
-            neuron_kernels.append([])
-            neuron_outputs.append([])
             for pixel_index_y in range(1, number_of_pixels-1):
                 x_position, y_position = pixel_index_to_position(pixel_index_x, pixel_index_y)
-                neurons[pixel_index_x - 1].append(create_neuron(x_position, y_position))
-                neuron_kernels[pixel_index_x - 1].append(create_neuron_kernel(x_position, y_position))
-                neuron_outputs[pixel_index_x - 1].append(create_neuron_output(x_position, y_position))
+                neuron_offsets.append([x_position, y_position, 0])
+        neurons = TemplateCopyGroup(create_neuron_template(), neuron_offsets)
+        neuron_kernels = TemplateCopyGroup(create_neuron_kernel_template(), neuron_offsets)
+        neuron_outputs = TemplateCopyGroup(create_neuron_output_template(), neuron_offsets)
 
         self.next_section(skip_animations=False)
-        self.play(FadeIn(neurons[0][0], shift=IN))
+        self.play(FadeIn(neurons[0], shift=IN))
         # Show the neuron kernel.
         self.next_section(skip_animations=False)
-        self.play(FadeIn(neuron_kernels[0][0], shift=IN))
+        self.play(FadeIn(neuron_kernels[0], shift=IN))
         # Move to angled view.
         self.next_section(skip_animations=False)
         self.move_camera(1.2 * math.tau / 8, -3 * math.tau / 8)
         # Show the neuron output.
         self.next_section(skip_animations=False)
-        self.play(FadeIn(neuron_outputs[0][0], shift=OUT))
+        self.play(FadeIn(neuron_outputs[0], shift=OUT))
         # Add another neuron
         self.next_section(skip_animations=False)
-        self.play(FadeIn(neurons[1][0], shift=IN), FadeIn(neuron_kernels[1][0], shift=IN))
+        self.play(FadeIn(neurons[neurons_per_row], shift=IN), FadeIn(neuron_kernels[neurons_per_row], shift=IN))
         # Add remaining neurons
         self.next_section(skip_animations=False)
-        add_neuron_animations = []
-        for x in range(len(neurons)):
-            for y in range(len(neurons[x])):
-                if (x == 0 or x == 1) and y == 0:
-                    continue  # Already added neuron and kernel.
-                add_neuron_animations.append(FadeIn(neurons[x][y], shift=IN))
-                add_neuron_animations.append(FadeIn(neuron_kernels[x][y], shift=IN))
-        self.play(LaggedStart(*add_neuron_animations))
+        already_added_indexes = [0, neurons_per_row]  # Already added neurons and kernels.
+        remaining_indexes = np.setdiff1d(np.arange(neurons.copy_count), already_added_indexes)
+        # Each neuron and its kernel keep their interleaved slots of the original lagged start.
+        lag_count = 2 * len(remaining_indexes)
+        self.play(
+            TemplateCopyLaggedFadeIn(neurons, shift=IN, copy_indexes=remaining_indexes,
+                                     lag_indexes=2 * np.arange(len(remaining_indexes)), lag_count=lag_count),
+            TemplateCopyLaggedFadeIn(neuron_kernels, shift=IN, copy_indexes=remaining_indexes,
+                                     lag_indexes=2 * np.arange(len(remaining_indexes)) + 1, lag_count=lag_count),
+        )
 
         self.next_section(skip_animations=False)
 
         self.wait(1)
 
 
-class XyRectangle(Surface):
-    def align_points_with_larger(self, larger_mobject):
-        super().align_points_with_larger(larger_mobject)
-
+class XyRectangle(Polygon):
     def __init__(self, x: float, y: float, x_size: float, y_size: float, z: float = 0.1, resolution=(10, 10)):
+        # A flat axis aligned rectangle only needs its four corners as a single face, `resolution` is kept for
+        # compatibility with the Surface based version and ignored.
         super().__init__(
-            func=lambda u, v: np.array([x + (u * x_size), y + (v * y_size), z]),
-            u_range=[0, 1],
-            v_range=[0, 1],
-            resolution=resolution,
+            [x, y, z], [x + x_size, y, z], [x + x_size, y + y_size, z], [x, y + y_size, z],
+            fill_color=BLUE_D,
+            fill_opacity=1.0,
+            stroke_color=LIGHT_GREY,
+            stroke_width=0.5,
         )
+        self.set_shade_in_3d(True)
 
 
 if __name__ == '__main__':
+    set_up_configuration()
     config.background_opacity = 0
     config.movie_file_extension = '.mov'
-    config.save_sections = True
-    config.quality = 'low_quality'
     ThreeDNeuronsLookingAtPixelsScene().render(preview=True)
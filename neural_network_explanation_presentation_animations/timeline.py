@@ -0,0 +1,232 @@
+import copy
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+from manim import Mobject, Animation, FadeIn, FadeOut, ReplacementTransform, ORIGIN
+from manim.utils.family import extract_mobject_family_members
+
+from neural_network_explanation_presentation_animations.batched_animations import BatchedLaggedFadeIn, \
+    BatchedReplacementTransform
+from neural_network_explanation_presentation_animations.section_snapshots import SectionSnapshot, \
+    SectionSnapshotStore, capture_camera_state, restore_camera_state
+from neural_network_explanation_presentation_animations.sectioned_scene import SectionedScene, SectionSelection
+
+
+class TimelineStep(ABC):
+    @abstractmethod
+    def apply(self, scene: SectionedScene, in_scene_mobjects: Set[Mobject]) -> List[Animation]:
+        pass
+
+
+class Add(TimelineStep):
+    def __init__(self, *mobjects: Mobject):
+        self.mobjects: List[Mobject] = list(mobjects)
+
+    def apply(self, scene: SectionedScene, in_scene_mobjects: Set[Mobject]) -> List[Animation]:
+        scene.add(*self.mobjects)
+        return []
+
+
+class Remove(TimelineStep):
+    def __init__(self, *mobjects: Mobject):
+        self.mobjects: List[Mobject] = list(mobjects)
+
+    def apply(self, scene: SectionedScene, in_scene_mobjects: Set[Mobject]) -> List[Animation]:
+        scene.remove(*self.mobjects)
+        return []
+
+
+class Enter(TimelineStep):
+    def __init__(self, *mobjects: Mobject, shift: np.ndarray = ORIGIN, lag_ratio: Optional[float] = None):
+        self.mobjects: List[Mobject] = list(mobjects)
+        self.shift: np.ndarray = shift
+        self.lag_ratio: Optional[float] = lag_ratio
+
+    def apply(self, scene: SectionedScene, in_scene_mobjects: Set[Mobject]) -> List[Animation]:
+        # Mobjects that already entered, for example as the target of a transform, are left as they are.
+        entering_mobjects = [mobject for mobject in self.mobjects if mobject not in in_scene_mobjects]
+        if len(entering_mobjects) == 0:
+            return []
+        if self.lag_ratio is None:
+            return [FadeIn(*entering_mobjects, shift=self.shift)]
+        return [BatchedLaggedFadeIn(*entering_mobjects, shift=self.shift, lag_ratio=self.lag_ratio)]
+
+
+class Exit(TimelineStep):
+    def __init__(self, *mobjects: Mobject):
+        self.mobjects: List[Mobject] = list(mobjects)
+
+    def apply(self, scene: SectionedScene, in_scene_mobjects: Set[Mobject]) -> List[Animation]:
+        return [FadeOut(*self.mobjects)]
+
+
+class Transform(TimelineStep):
+    def __init__(self, source: Mobject, target: Mobject):
+        self.source: Mobject = source
+        self.target: Mobject = target
+
+    def apply(self, scene: SectionedScene, in_scene_mobjects: Set[Mobject]) -> List[Animation]:
+        return [ReplacementTransform(self.source, self.target)]
+
+
+class BatchedTransform(TimelineStep):
+    def __init__(self, sources: Sequence[Mobject], targets: Sequence[Mobject]):
+        self.sources: List[Mobject] = list(sources)
+        self.targets: List[Mobject] = list(targets)
+
+    def apply(self, scene: SectionedScene, in_scene_mobjects: Set[Mobject]) -> List[Animation]:
+        return [BatchedReplacementTransform(self.sources, self.targets)]
+
+
+class Play(TimelineStep):
+    def __init__(self, *animations: Animation):
+        self.animations: List[Animation] = list(animations)
+
+    def apply(self, scene: SectionedScene, in_scene_mobjects: Set[Mobject]) -> List[Animation]:
+        return self.animations
+
+
+class TimelineResources:
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        self.factories: Dict[str, Callable[[], Any]] = factories
+        self.built: Dict[str, Any] = {}
+        # Handed from one section's steps to a later section's, through `produce` and `consume` only.
+        self.values: Dict[str, Any] = {}
+        self.scene: Optional[SectionedScene] = None
+        self.section: Optional['TimelineSection'] = None
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self.built:
+            raise KeyError(f'Resource {name} is used by a section that does not declare it.')
+        return self.built[name]
+
+    def materialize(self, names: Sequence[str]):
+        for name in names:
+            if name not in self.built:
+                self.built[name] = self.factories[name]()
+
+    def release(self, names: Sequence[str]):
+        # Only the timeline's handle is dropped. A resource's memory is freed once nothing else holds it, so mobjects
+        # that are still in the scene (or held by a later section's values) stay alive until they are removed.
+        for name in names:
+            self.built.pop(name, None)
+
+    def produce(self, name: str, value: Any):
+        if name not in self.section.produces:
+            raise Exception(f'Section {self.section.name} produces {name} without declaring it.')
+        self.values[name] = value
+
+    def consume(self, name: str) -> Any:
+        if name not in self.section.consumes:
+            raise Exception(f'Section {self.section.name} consumes {name} without declaring it.')
+        return self.values.pop(name)
+
+
+class TimelineSection:
+    def __init__(self, name: str, uses: Sequence[str] = (),
+                 create_steps: Optional[Callable[[TimelineResources], List[TimelineStep]]] = None,
+                 wait_seconds: Optional[float] = None, produces: Sequence[str] = (), consumes: Sequence[str] = ()):
+        self.name: str = name
+        self.uses: List[str] = list(uses)
+        # Values handed to later sections, declared like `uses` so the timeline can check them before rendering.
+        self.produces: List[str] = list(produces)
+        self.consumes: List[str] = list(consumes)
+        self.create_steps: Optional[Callable[[TimelineResources], List[TimelineStep]]] = create_steps
+        self.wait_seconds: Optional[float] = wait_seconds
+
+
+class Timeline:
+    def __init__(self, resource_factories: Dict[str, Callable[[], Any]], sections: Sequence[TimelineSection]):
+        self.resources: TimelineResources = TimelineResources(resource_factories)
+        self.sections: List[TimelineSection] = list(sections)
+        # Each resource is released after the last section that uses it, so only the live part of the deck is held.
+        self.last_use_section_indexes: Dict[str, int] = {}
+        for section_index, section in enumerate(self.sections):
+            for name in section.uses:
+                if name not in resource_factories:
+                    raise Exception(f'Section {section.name} uses the unknown resource {name}.')
+                self.last_use_section_indexes[name] = section_index
+        # Every consumed value must be produced by an earlier section, and every produced value consumed later.
+        pending_value_names: Set[str] = set()
+        for section in self.sections:
+            for name in section.consumes:
+                if name not in pending_value_names:
+                    raise Exception(f'Section {section.name} consumes {name}, which no earlier section produces.')
+                pending_value_names.remove(name)
+            for name in section.produces:
+                if name in pending_value_names:
+                    raise Exception(f'Section {section.name} produces {name} before the last one was consumed.')
+                pending_value_names.add(name)
+        if len(pending_value_names) > 0:
+            raise Exception(f'Values {", ".join(sorted(pending_value_names))} are produced but never consumed.')
+
+    def run(self, scene: SectionedScene, snapshot_store: Optional[SectionSnapshotStore] = None):
+        self.resources.scene = scene
+        resume_snapshot = self.load_resume_snapshot(scene, snapshot_store)
+        for section_index, section in enumerate(self.sections):
+            scene.next_section(section.name)
+            if resume_snapshot is not None and section_index < resume_snapshot.section_index:
+                continue  # The snapshot holds everything these sections built.
+            if resume_snapshot is not None and section_index == resume_snapshot.section_index:
+                self.restore_snapshot(scene, resume_snapshot)
+                resume_snapshot = None
+            elif (snapshot_store is not None and snapshot_store.save_snapshots and
+                  not snapshot_store.has_snapshot(section_index, section.name)):
+                # An existing snapshot was saved under the same key, so it already holds this state.
+                snapshot_store.save(self.capture_snapshot(scene, section_index))
+            # Resources are built when their first section is reached, never up front.
+            self.resources.materialize(section.uses)
+            self.run_section(scene, section)
+            self.resources.release([name for name, last_use_section_index in self.last_use_section_indexes.items()
+                                    if last_use_section_index == section_index])
+
+    def first_selected_section_index(self, section_selection: SectionSelection) -> int:
+        # Probed on a copy, so selections that track their progress, like `SectionRangeSelection`, are left as is.
+        probe_section_selection = copy.deepcopy(section_selection)
+        for section_index, section in enumerate(self.sections):
+            if probe_section_selection.ends_before(section_index, section.name):
+                break
+            if probe_section_selection.includes(section_index, section.name):
+                return section_index
+        return 0
+
+    def load_resume_snapshot(self, scene: SectionedScene, snapshot_store: Optional[SectionSnapshotStore]
+                             ) -> Optional[SectionSnapshot]:
+        if snapshot_store is None:
+            return None
+        # The latest snapshot at or before the first rendered section, the sections in between are replayed.
+        for section_index in range(self.first_selected_section_index(scene.section_selection), 0, -1):
+            section_name = self.sections[section_index].name
+            if snapshot_store.has_snapshot(section_index, section_name):
+                snapshot = snapshot_store.load(section_index, section_name)
+                if snapshot is not None:
+                    return snapshot
+        return None
+
+    def capture_snapshot(self, scene: SectionedScene, section_index: int) -> SectionSnapshot:
+        return SectionSnapshot(section_index, self.sections[section_index].name, scene.mobjects,
+                               scene.foreground_mobjects, self.resources.built, self.resources.values,
+                               capture_camera_state(scene))
+
+    def restore_snapshot(self, scene: SectionedScene, snapshot: SectionSnapshot):
+        scene.mobjects = list(snapshot.mobjects)
+        scene.foreground_mobjects = list(snapshot.foreground_mobjects)
+        self.resources.built = dict(snapshot.built_resources)
+        self.resources.values = dict(snapshot.values)
+        restore_camera_state(scene, snapshot.camera_state)
+
+    def run_section(self, scene: SectionedScene, section: TimelineSection):
+        self.resources.section = section
+        steps = [] if section.create_steps is None else section.create_steps(self.resources)
+        missing_value_names = [name for name in section.produces if name not in self.resources.values]
+        if len(missing_value_names) > 0:
+            raise Exception(f'Section {section.name} did not produce {", ".join(missing_value_names)}.')
+        in_scene_mobjects = set(extract_mobject_family_members(scene.mobjects))
+        animations: List[Animation] = []
+        for step in steps:
+            animations.extend(step.apply(scene, in_scene_mobjects))
+        if len(animations) > 0:
+            scene.play(*animations)
+        if section.wait_seconds is not None:
+            scene.wait(section.wait_seconds)
@@ -1,9 +1,184 @@
+import argparse
+import os
 import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-input_video_root_path = Path('/Users/golmschenk/Desktop/layers_sections')
-output_video_root_path = Path('/Users/golmschenk/Desktop/layers_sections_out')
-output_video_root_path.mkdir(exist_ok=True, parents=True)
-for path in input_video_root_path.glob('*.mov'):
-    output_path = output_video_root_path.joinpath(path.name)
-    subprocess.run(['ffmpeg', '-y', '-i', str(path), '-c:v', 'prores_ks', str(output_path)])
+
+class TranscodeResult:
+    def __init__(self, input_path: Path, output_path: Path, skipped: bool, elapsed_seconds: float = 0,
+                 duration_seconds: float = 0, error: Optional[str] = None):
+        self.input_path: Path = input_path
+        self.output_path: Path = output_path
+        self.skipped: bool = skipped
+        self.elapsed_seconds: float = elapsed_seconds
+        self.duration_seconds: float = duration_seconds
+        self.error: Optional[str] = error
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    def summary_line(self) -> str:
+        if self.failed:
+            return f'{self.input_path.name}: failed, {self.error}'
+        if self.skipped:
+            return f'{self.input_path.name}: up to date, skipped'
+        input_megabytes = self.input_path.stat().st_size / 1e6
+        megabytes_per_second = input_megabytes / max(self.elapsed_seconds, 1e-9)
+        realtime_factor = self.duration_seconds / max(self.elapsed_seconds, 1e-9)
+        return (f'{self.input_path.name}: {self.elapsed_seconds:.1f}s, {input_megabytes:.1f} MB in, '
+                f'{megabytes_per_second:.1f} MB/s, {realtime_factor:.2f}x realtime')
+
+
+def video_duration_seconds(path: Path) -> Optional[float]:
+    completed_process = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1',
+         str(path)], capture_output=True, text=True)
+    try:
+        return float(completed_process.stdout.strip())
+    except ValueError:
+        return None
+
+
+def is_up_to_date(input_path: Path, output_path: Path) -> bool:
+    if not output_path.exists() or output_path.stat().st_mtime < input_path.stat().st_mtime:
+        return False
+    output_duration = video_duration_seconds(output_path)
+    return output_duration is not None and output_duration > 0
+
+
+def transcode(input_path: Path, output_path: Path, codec: str = 'prores_ks') -> TranscodeResult:
+    if is_up_to_date(input_path, output_path):
+        return TranscodeResult(input_path, output_path, skipped=True)
+    # Encode to a temporary name so an interrupted run never leaves a partial file that looks finished.
+    temporary_output_path = output_path.with_name(f'.{output_path.stem}.partial{output_path.suffix}')
+    start_time = time.perf_counter()
+    try:
+        subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-i', str(input_path), '-c:v', codec,
+                        str(temporary_output_path)], check=True)
+        elapsed_seconds = time.perf_counter() - start_time
+        os.replace(temporary_output_path, output_path)
+    finally:
+        temporary_output_path.unlink(missing_ok=True)  # Only left when ffmpeg failed or was interrupted.
+    duration_seconds = video_duration_seconds(output_path) or 0
+    return TranscodeResult(input_path, output_path, skipped=False, elapsed_seconds=elapsed_seconds,
+                           duration_seconds=duration_seconds)
+
+
+class TranscodePipeline:
+    def __init__(self, input_video_root_path: Path, output_video_root_path: Path, pattern: str = '*.mov',
+                 worker_count: Optional[int] = None, codec: str = 'prores_ks'):
+        if worker_count is None:
+            worker_count = os.cpu_count()
+        self.input_video_root_path: Path = input_video_root_path
+        self.output_video_root_path: Path = output_video_root_path
+        self.pattern: str = pattern
+        self.codec: str = codec
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=worker_count)
+        self.futures: List[Tuple[Path, Future]] = []
+        self.output_video_root_path.mkdir(exist_ok=True, parents=True)
+
+    def __enter__(self) -> 'TranscodePipeline':
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.shutdown()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+    def output_path_for(self, input_path: Path) -> Path:
+        return self.output_video_root_path.joinpath(input_path.name)
+
+    def submit(self, input_path: Path):
+        self.futures.append((input_path, self.executor.submit(transcode, input_path, self.output_path_for(input_path),
+                                                              self.codec)))
+
+    def run(self) -> List[TranscodeResult]:
+        for input_path in sorted(self.input_video_root_path.glob(self.pattern)):
+            self.submit(input_path)
+        return self.collect()
+
+    def watch(self, poll_interval_seconds: float = 2.0, idle_timeout_seconds: Optional[float] = None
+              ) -> List[TranscodeResult]:
+        # A file is only submitted once its size and modification time hold still between two polls, so files that
+        # manim is still writing are left alone until they are complete.
+        previous_signatures: Dict[Path, Tuple[int, float]] = {}
+        submitted_signatures: Dict[Path, Tuple[int, float]] = {}
+        last_activity_time = time.monotonic()
+        try:
+            while idle_timeout_seconds is None or time.monotonic() - last_activity_time < idle_timeout_seconds:
+                for input_path in sorted(self.input_video_root_path.glob(self.pattern)):
+                    try:
+                        input_stat = input_path.stat()
+                    except FileNotFoundError:
+                        continue
+                    signature = (input_stat.st_size, input_stat.st_mtime)
+                    if (previous_signatures.get(input_path) == signature and
+                            submitted_signatures.get(input_path) != signature):
+                        self.submit(input_path)
+                        submitted_signatures[input_path] = signature
+                        last_activity_time = time.monotonic()
+                    previous_signatures[input_path] = signature
+                time.sleep(poll_interval_seconds)
+        except KeyboardInterrupt:
+            pass
+        return self.collect()
+
+    def collect(self) -> List[TranscodeResult]:
+        # A failed file becomes a result row of its own, so it never hides the summary of the others.
+        results = []
+        for input_path, future in self.futures:
+            try:
+                results.append(future.result())
+            except Exception as exception:
+                results.append(TranscodeResult(input_path, self.output_path_for(input_path), skipped=False,
+                                               error=str(exception)))
+        self.futures = []
+        return results
+
+
+def print_summary(results: List[TranscodeResult], total_elapsed_seconds: float):
+    for result in results:
+        print(result.summary_line())
+    failed_results = [result for result in results if result.failed]
+    transcoded_results = [result for result in results if not result.skipped and not result.failed]
+    skipped_count = len(results) - len(transcoded_results) - len(failed_results)
+    total_megabytes = sum(result.input_path.stat().st_size for result in transcoded_results) / 1e6
+    print(f'Transcoded {len(transcoded_results)} files, skipped {skipped_count}, failed {len(failed_results)}, '
+          f'{total_megabytes:.1f} MB in {total_elapsed_seconds:.1f}s '
+          f'({total_megabytes / max(total_elapsed_seconds, 1e-9):.1f} MB/s overall)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Transcode rendered section videos to ProRes.')
+    parser.add_argument('input_video_root_path', type=Path, help='Directory containing the rendered videos.')
+    parser.add_argument('output_video_root_path', type=Path, help='Directory to write the transcoded videos to.')
+    parser.add_argument('--pattern', default='*.mov', help='Glob of the input videos to transcode.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of concurrent ffmpeg processes. Defaults to the core count.')
+    parser.add_argument('--codec', default='prores_ks', help='ffmpeg video codec of the output.')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep watching the input directory and transcode each video as soon as it is written.')
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help='When watching, stop after this many seconds without a new video.')
+    arguments = parser.parse_args()
+    start_time = time.perf_counter()
+    with TranscodePipeline(arguments.input_video_root_path, arguments.output_video_root_path,
+                           pattern=arguments.pattern, worker_count=arguments.workers,
+                           codec=arguments.codec) as pipeline:
+        if arguments.watch:
+            results = pipeline.watch(idle_timeout_seconds=arguments.idle_timeout)
+        else:
+            results = pipeline.run()
+    print_summary(results, time.perf_counter() - start_time)
+    if any(result.failed for result in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()